@@ -0,0 +1,171 @@
+"""
+Stress test of the result entry by several arbiters at once (shared mode, see Tournament.locked).
+
+Writes a synthetic tournament with its first round paired, then starts one process per arbiter.
+Each match is given to --overlap arbiters, who enter a random result for it: the first result
+entered is kept, and the others are refused unless they are the same. The journal is compacted
+every --compact records, so the file is also rewritten while the others are entering results.
+
+At the end, the tournament is read again: every match must have a result, that result must be
+one an arbiter was told was recorded, and the points must match the results (no lost or
+doubled update). The exit status is 1 otherwise.
+
+Run from the project root: python -m benchmarks.bench_arbiters --arbiters 8 --players 1000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import models.tournament as tournament_module
+from models import Tournament, TournamentOperations
+from models.files import write_json_atomic
+from models.synthetic import PlayerGenerator, tournament_data
+
+
+def make_tournament(folder, players, seed):
+    """Writes a tournament of players players with round 1 paired; returns its matches"""
+    filepath = folder / "tournament.json"
+    members = PlayerGenerator(seed).players(players)
+    write_json_atomic(
+        filepath, tournament_data(members, 0, 4, random.Random(seed), "Stress test")
+    )
+    tournament = Tournament.from_json(filepath)
+    matches = TournamentOperations.round_matches(tournament, 1)
+    tournament.save()
+    forget_tournaments()
+    return filepath, [list(match["players"]) for match in matches]
+
+
+def forget_tournaments():
+    Tournament.loaded.clear()
+    Tournament.tournaments.clear()
+
+
+def enter_results(filepath, entries, compact, seed):
+    """
+    An arbiter: enters a random result for each (match index, players) entry.
+    Returns the results recorded (or already there), the number refused and the time taken.
+    """
+    Tournament.shared = True
+    tournament_module.JOURNAL_COMPACT_THRESHOLD = compact
+    rng = random.Random(seed)
+
+    start = time.perf_counter()
+    tournament = Tournament.from_json(filepath)
+    recorded = []
+    refused = 0
+    for match_index, players in entries:
+        winner = rng.choice(players + [None]) if len(players) == 2 else players[0]
+        if tournament.enter_result(1, match_index, winner, players):
+            recorded.append((match_index, winner))
+        else:
+            refused += 1
+    return recorded, refused, time.perf_counter() - start
+
+
+def check(filepath, matches, recorded):
+    """Errors found in the tournament file, after all the arbiters are done"""
+    forget_tournaments()
+    Tournament.shared = True
+    tournament = Tournament.from_json(filepath)
+    errors = []
+
+    expected_points = defaultdict(float)
+    for match_index, match in enumerate(tournament.rounds[0]):
+        if match["players"] != matches[match_index]:
+            errors.append(f"match {match_index}: players changed")
+        if not match.get("completed"):
+            errors.append(f"match {match_index}: result lost")
+            continue
+        winners = recorded[match_index]
+        if len(winners) != 1 or match.get("winner") not in winners:
+            errors.append(
+                f"match {match_index}: {match.get('winner')} in the file,"
+                f" arbiters were told {sorted(winners, key=str)}"
+            )
+        if len(match["players"]) == 1 or match.get("winner") is not None:
+            expected_points[match.get("winner")] += 1
+        else:
+            for chess_id in match["players"]:
+                expected_points[chess_id] += 0.5
+
+    for player in tournament.registered_players:
+        if player.points != expected_points[player.chess_id]:
+            errors.append(
+                f"{player.chess_id}: {player.points} points,"
+                f" {expected_points[player.chess_id]} expected"
+            )
+    return errors
+
+
+def run(arbiters, players, overlap, compact, seed):
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath, matches = make_tournament(Path(tmp), players, seed)
+
+        # Each match goes to overlap arbiters, in a random order for each of them
+        work = [[] for _ in range(arbiters)]
+        for match_index, match_players in enumerate(matches):
+            for k in range(min(overlap, arbiters)):
+                work[(match_index + k) % arbiters].append((match_index, match_players))
+        rng = random.Random(seed)
+        for entries in work:
+            rng.shuffle(entries)
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=arbiters) as executor:
+            results = list(
+                executor.map(
+                    enter_results,
+                    [filepath] * arbiters,
+                    work,
+                    [compact] * arbiters,
+                    [f"{seed}-{number}" for number in range(arbiters)],
+                )
+            )
+        elapsed = time.perf_counter() - start
+
+        recorded = defaultdict(set)
+        refused = 0
+        for arbiter_recorded, arbiter_refused, _ in results:
+            refused += arbiter_refused
+            for match_index, winner in arbiter_recorded:
+                recorded[match_index].add(winner)
+
+        entries = sum(len(entries) for entries in work)
+        print(
+            f"{arbiters} arbiters, {len(matches)} matches, {entries} results entered"
+            f" ({refused} refused as conflicts) in {elapsed:.2f} s:"
+            f" {entries / elapsed:.0f} results/s"
+        )
+        for number, (_, _, seconds) in enumerate(results):
+            print(f"Arbiter {number}: {len(work[number])} results in {seconds:.2f} s")
+
+        return check(filepath, matches, recorded)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent result entry stress test.")
+    parser.add_argument("--arbiters", type=int, default=4, help="Number of processes")
+    parser.add_argument("--players", type=int, default=400, help="Number of players")
+    parser.add_argument(
+        "--overlap", type=int, default=2, help="Arbiters entering each match"
+    )
+    parser.add_argument(
+        "--compact", type=int, default=50, help="Journal records before compaction"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+    errors = run(args.arbiters, args.players, args.overlap, args.compact, args.seed)
+    for error in errors[:20]:
+        print(f"ERROR {error}")
+    if errors:
+        print(f"{len(errors)} error(s)")
+        sys.exit(1)
+    print("No lost update.")
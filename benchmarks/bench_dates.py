@@ -0,0 +1,80 @@
+"""
+Micro-benchmarks for the date codec (models.dates) against datetime.strptime.
+
+Run from the project root: python -m benchmarks.bench_dates --count 100000
+"""
+
+import argparse
+import random
+import timeit
+from datetime import datetime
+
+from models.dates import format_ordinal, parse_ordinal
+
+
+def make_dates(count, distinct):
+    random.seed(0)
+    pool = [
+        f"{random.randint(1, 28):02d}-{random.randint(1, 12):02d}-{random.randint(1920, 2008)}"
+        for _ in range(distinct)
+    ]
+    return [random.choice(pool) for _ in range(count)]
+
+
+def report(label, seconds, count):
+    print(f"{label}: {seconds * 1000:.1f} ms ({seconds / count * 1e9:.0f} ns per date)")
+
+
+def run(count, distinct):
+    values = make_dates(count, distinct)
+
+    def strptime_parse():
+        for value in values:
+            datetime.strptime(value, "%d-%m-%Y")
+
+    def codec_uncached():
+        parse_ordinal.cache_clear()
+        for value in values:
+            parse_ordinal.__wrapped__(value)
+
+    def codec_cached():
+        for value in values:
+            parse_ordinal(value)
+
+    def strptime_sort():
+        sorted(values, key=lambda v: datetime.strptime(v, "%d-%m-%Y"))
+
+    def codec_sort():
+        sorted(values, key=parse_ordinal)
+
+    ordinals = [parse_ordinal(v) for v in values]
+
+    def strftime_format():
+        for ordinal in ordinals:
+            datetime.fromordinal(ordinal).strftime("%d-%m-%Y")
+
+    def codec_format():
+        for ordinal in ordinals:
+            format_ordinal(ordinal)
+
+    for label, func in [
+        ("strptime", strptime_parse),
+        ("codec, no cache", codec_uncached),
+        ("codec, cached", codec_cached),
+        ("sort with strptime key", strptime_sort),
+        ("sort with codec key", codec_sort),
+        ("strftime", strftime_format),
+        ("codec format", codec_format),
+    ]:
+        report(label, min(timeit.repeat(func, number=1, repeat=3)), count)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the date codec.")
+    parser.add_argument("--count", type=int, default=100000, help="Number of dates")
+    parser.add_argument(
+        "--distinct", type=int, default=5000, help="Number of distinct dates"
+    )
+
+    args = parser.parse_args()
+    run(args.count, args.distinct)
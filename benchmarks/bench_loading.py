@@ -0,0 +1,103 @@
+"""
+Benchmark for the loading of club and tournament files.
+
+Writes synthetic club and tournament files in a temporary folder, then times ClubManager and
+Tournament.load_tournaments_from_folder with the serial path, a thread pool and a process pool.
+
+Each ClubManager run starts from an empty club cache, so every file is read again, and the
+timing includes the players: the loader only reads the club names, the players of each club
+are then read by its own background reader (see ChessClub.start_loading).
+
+Run from the project root: python -m benchmarks.bench_loading --files 500 --players 200
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from models import ClubManager, Tournament
+from models.club_cache import ClubCache
+from models.loader import Loader
+from models.storage import JSONStorage
+
+LOADERS = {
+    "serial": Loader(max_workers=1),
+    "threads": Loader(),
+    "processes": Loader(use_processes=True),
+}
+
+
+def make_player(i):
+    return {
+        "name": f"Player {i}",
+        "email": f"player{i}@example.com",
+        "chess_id": f"BL{i:05d}",
+        "birthday": f"{i % 28 + 1:02d}-{i % 12 + 1:02d}-{1950 + i % 50}",
+    }
+
+
+def make_files(folder, count, players):
+    clubs = folder / "clubs"
+    tournaments = folder / "tournaments"
+    clubs.mkdir()
+    tournaments.mkdir()
+
+    for n in range(count):
+        members = [make_player(i) for i in range(players)]
+        with open(clubs / f"club{n}.json", "w") as fp:
+            json.dump({"name": f"Club {n}", "players": members}, fp)
+
+        data = {
+            "name": f"Tournament {n}",
+            "venue": "Hall",
+            "dates": {"from": "01-01-2024", "to": "02-01-2024"},
+            "players": [dict(p, points=0.0) for p in members],
+            "number_of_rounds": 4,
+            "current_round": 1,
+            "completed": False,
+            "finished": False,
+            "rounds": [],
+        }
+        with open(tournaments / f"tournament{n}.json", "w") as fp:
+            json.dump(data, fp, indent=4)
+
+    return clubs, tournaments
+
+
+def run(count, players):
+    with tempfile.TemporaryDirectory() as tmp:
+        clubs, tournaments = make_files(Path(tmp), count, players)
+
+        for name, loader in LOADERS.items():
+            # A cache of its own, so the files are not found in the one of the process
+            storage = JSONStorage(clubs_folder=clubs, loader=loader, cache=ClubCache())
+            start = time.perf_counter()
+            manager = ClubManager(clubs, storage=storage)
+            for club in manager.clubs:
+                club.start_loading()
+            loaded_players = sum(len(club.players) for club in manager.clubs)
+            elapsed = time.perf_counter() - start
+            print(
+                f"ClubManager ({name}): {len(manager.clubs)} clubs,"
+                f" {loaded_players} players in {elapsed:.3f} s"
+            )
+
+        for name, loader in LOADERS.items():
+            # Start from an empty identity map, so every file is loaded again
+            Tournament.loaded.clear()
+            Tournament.tournaments.clear()
+            start = time.perf_counter()
+            loaded = Tournament.load_tournaments_from_folder(tournaments, loader)
+            elapsed = time.perf_counter() - start
+            print(f"Tournaments ({name}): {len(loaded)} in {elapsed:.3f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the loading of files.")
+    parser.add_argument("--files", type=int, default=500, help="Number of files")
+    parser.add_argument("--players", type=int, default=200, help="Players per file")
+
+    args = parser.parse_args()
+    run(args.files, args.players)
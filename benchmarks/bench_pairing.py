@@ -0,0 +1,83 @@
+"""
+Benchmark for the Swiss pairing engine.
+
+Plays a few rounds of a synthetic open tournament, then times the pairing of each round
+and checks that every player is paired and that there is no rematch.
+It also checks that small fields (33 players over 4 rounds, where the players left at the
+bottom used to meet again) are paired without rematches; the exit status is 1 otherwise.
+
+Run from the project root: python -m benchmarks.bench_pairing --players 2000 --rounds 9
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from models import TournamentOperations
+from models.simulation_runner import run_simulations
+from models.tournament import PlayerDetails
+
+
+def make_players(count):
+    return [
+        PlayerDetails(
+            name=f"Player {i}", email="", chess_id=f"BP{i:05d}", birthday=""
+        )
+        for i in range(count)
+    ]
+
+
+def run(count, rounds, seed=0):
+    random.seed(seed)
+    players = make_players(count)
+    previous_pairings = set()
+    byes = set()
+
+    for round_number in range(1, rounds + 1):
+        start = time.perf_counter()
+        pairings = TournamentOperations.generate_swiss_pairings(
+            players, set(previous_pairings), byes
+        )
+        elapsed = time.perf_counter() - start
+
+        paired = [p.chess_id for pair in pairings for p in pair if p is not None]
+        assert len(paired) == len(set(paired)) == count, "Some players are not paired"
+
+        rematches = 0
+        for player1, player2 in pairings:
+            if player2 is None:
+                byes.add(player1.chess_id)
+                continue
+            pair = (player1.chess_id, player2.chess_id)
+            if pair in previous_pairings or pair[::-1] in previous_pairings:
+                rematches += 1
+            previous_pairings.add(pair)
+
+        print(
+            f"Round {round_number}: {len(pairings)} pairings in {elapsed * 1000:.1f} ms"
+            f" ({rematches} rematches)"
+        )
+        TournamentOperations.play_round(pairings)
+
+
+def check_small_fields(players=33, rounds=4, tournaments=200, seed=0):
+    """Number of rematches over tournaments small enough to need the bottom groups widened"""
+    stats = run_simulations(players, rounds, tournaments, workers=1, seed=seed)
+    print(
+        f"{tournaments} tournaments of {players} players, {rounds} rounds:"
+        f" {stats.rematches} rematches"
+    )
+    return stats.rematches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Swiss pairing.")
+    parser.add_argument("--players", type=int, default=2000, help="Number of players")
+    parser.add_argument("--rounds", type=int, default=9, help="Number of rounds")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    args = parser.parse_args()
+    run(args.players, args.rounds, args.seed)
+    if check_small_fields():
+        sys.exit(1)
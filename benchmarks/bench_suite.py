@@ -0,0 +1,224 @@
+"""
+Benchmark suite for the hot paths of pairing, persistence and loading.
+
+Creates a synthetic club and tournament for each size (10, 1k and 100k players by default),
+then times generate_swiss_pairings, play_round, sort_players, ChessClub.save,
+ClubManager.__init__ with the players (cold, and with the clubs cached), Tournament.from_json and
+Tournament.to_dict. The players come from the seeded generator of models.synthetic, so every
+run times the same data.
+
+The results can be written to a JSON file, and compared with a previous one: a benchmark
+slower than its baseline by more than the threshold, and by more than --min-delta (so that the
+noise of the sub-millisecond benchmarks is not flagged), is flagged, and the exit status is 1.
+
+Run from the project root:
+    python -m benchmarks.bench_suite --output results.json
+    python -m benchmarks.bench_suite --baseline results.json --threshold 0.2 --min-delta 1
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from models import ChessClub, ClubManager, Tournament, TournamentOperations
+from models.club_cache import club_cache
+from models.player import Player
+from models.synthetic import PlayerGenerator, tournament_data
+from models.tournament import PlayerDetails
+
+SIZES = (10, 1000, 100000)
+# A benchmark is repeated until it ran this long (in seconds), or MAX_REPEATS times: the fast ones
+# run many times, so that their best time is stable
+MIN_TIME = 0.2
+MAX_REPEATS = 100
+# Rounds already played in the synthetic tournaments
+PLAYED_ROUNDS = 2
+# A slowdown smaller than this (in seconds) is noise, whatever the threshold
+MIN_DELTA = 0.001
+
+
+def make_members(count, seed=0):
+    return PlayerGenerator(seed).players(count)
+
+
+def make_tournament_data(members, seed=0):
+    """A tournament of the members, with PLAYED_ROUNDS rounds played"""
+    return tournament_data(
+        members, PLAYED_ROUNDS, PLAYED_ROUNDS + 2, random.Random(seed), "Benchmark"
+    )
+
+
+def measure(function, setup=None):
+    """Times function (after setup, which is not timed), repeated up to MAX_REPEATS times"""
+    times = []
+    while len(times) < MAX_REPEATS and sum(times) < MIN_TIME:
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        function(argument) if setup else function()
+        times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "repeats": len(times),
+    }
+
+
+def bench_size(size, folder):
+    """Times the hot paths for a size; returns {benchmark name: timings}"""
+    members = make_members(size)
+    data = make_tournament_data(members)
+    results = {}
+
+    def players():
+        return [PlayerDetails(**player) for player in data["players"]]
+
+    def previous_pairings():
+        return {
+            tuple(match["players"])
+            for round_matches in data["rounds"]
+            for match in round_matches
+            if len(match["players"]) == 2
+        }
+
+    results["generate_swiss_pairings"] = measure(
+        lambda args: TournamentOperations.generate_swiss_pairings(*args),
+        lambda: (players(), previous_pairings()),
+    )
+    results["play_round"] = measure(
+        lambda pairings: TournamentOperations.play_round(pairings, random.Random(0)),
+        lambda: TournamentOperations.generate_swiss_pairings(
+            players(), previous_pairings()
+        ),
+    )
+    results["sort_players"] = measure(
+        TournamentOperations.sort_players, lambda: players()
+    )
+
+    clubs = folder / "clubs"
+    clubs.mkdir()
+    club = ChessClub.from_players(
+        clubs / "club.json", f"Club {size}", [Player(**m) for m in members]
+    )
+    results["ChessClub.save"] = measure(club.save)
+    def load_clubs(_=None):
+        # The players are read too (they are streamed from the file when first needed)
+        manager = ClubManager(clubs)
+        for loaded in manager.clubs:
+            len(loaded.players)
+
+    # Cold: the club files are read again; cached: only their stats are
+    results["ClubManager.__init__"] = measure(load_clubs, club_cache.clear)
+    results["ClubManager.__init__ (cached)"] = measure(load_clubs)
+
+    filepath = folder / "tournament.json"
+    with open(filepath, "w") as fp:
+        json.dump(data, fp)
+
+    def load_tournament(_):
+        return Tournament.from_json(filepath)
+
+    def forget_tournaments():
+        # Start from an empty identity map, so the file is loaded again
+        Tournament.loaded.clear()
+        Tournament.tournaments.clear()
+
+    results["Tournament.from_json"] = measure(load_tournament, forget_tournaments)
+    forget_tournaments()
+    tournament = Tournament.from_json(filepath)
+    results["Tournament.to_dict"] = measure(tournament.to_dict)
+    forget_tournaments()
+    return results
+
+
+def run(sizes):
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, timings in bench_size(size, Path(tmp)).items():
+                key = f"{name}[{size}]"
+                results[key] = timings
+                print(
+                    f"{key:40} {timings['min'] * 1000:10.2f} ms"
+                    f" (median {timings['median'] * 1000:.2f} ms,"
+                    f" {timings['repeats']} runs)"
+                )
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": list(sizes),
+        },
+        "results": results,
+    }
+
+
+def regressions(report, baseline, threshold, min_delta=MIN_DELTA):
+    """
+    (name, baseline time, time) of the benchmarks slower than baseline by more than threshold,
+    and by more than min_delta seconds
+    """
+    slower = []
+    for name, timings in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if (
+            previous
+            and timings["min"] > previous["min"] * (1 + threshold)
+            and timings["min"] - previous["min"] > min_delta
+        ):
+            slower.append((name, previous["min"], timings["min"]))
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=SIZES,
+        help="Numbers of players",
+    )
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Slowdown flagged as a regression (0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=MIN_DELTA * 1000,
+        help="Smallest slowdown flagged, in ms (below it, the difference is noise)",
+    )
+
+    args = parser.parse_args()
+    report = run(args.sizes)
+
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(report, fp, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+        slower = regressions(
+            report, baseline, args.threshold, args.min_delta / 1000
+        )
+        for name, before, after in slower:
+            print(
+                f"REGRESSION {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms"
+                f" (+{after / before - 1:.0%})"
+            )
+        if slower:
+            sys.exit(1)
+        print("No regression.")
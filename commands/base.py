@@ -1,5 +1,7 @@
 from abc import ABCMeta, abstractmethod
 
+from models.profiling import profiler
+
 
 class BaseCommand(metaclass=ABCMeta):
     """This is the base class for a command"""
@@ -11,4 +13,5 @@ class BaseCommand(metaclass=ABCMeta):
 
     def __call__(self):
         """Syntactic sugar: calling the instance calls its execute() method"""
-        return self.execute()
+        with profiler.span(type(self).__name__, "command"):
+            return self.execute()
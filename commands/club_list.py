@@ -1,5 +1,7 @@
+from pathlib import Path
+
 from commands.context import Context
-from models import ClubManager
+from models import ClubManager, get_storage
 from .base import BaseCommand
 
 
@@ -7,5 +9,8 @@ class ClubListCmd(BaseCommand):
     """Command to get the list of clubs"""
 
     def execute(self):
-        cm = ClubManager()
+        cm = ClubManager(storage=get_storage())
+        # The clubs that could not be loaded are not listed: say so
+        for location, e in cm.errors:
+            print(f"Could not load club file {Path(location).name}: {e}")
         return Context("main-menu", clubs=cm.clubs)
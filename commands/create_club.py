@@ -1,5 +1,5 @@
 from commands.context import Context
-from models import ClubManager
+from models import ClubManager, get_storage
 from .base import BaseCommand
 
 
@@ -11,6 +11,6 @@ class ClubCreateCmd(BaseCommand):
 
     def execute(self):
         """Uses a ClubManager instance to create the club and add it to the list of managed clubs"""
-        cm = ClubManager()
+        cm = ClubManager(storage=get_storage())
         club = cm.create(self.name)
         return Context("club-view", club=club)
@@ -1,6 +1,7 @@
 from commands.base import BaseCommand
 from commands.context import Context
-from models import Tournament
+from models import get_storage
+from models.autosave import autosaver
 
 
 class TournamentListCmd(BaseCommand):
@@ -12,7 +13,9 @@ class TournamentListCmd(BaseCommand):
         self.tournaments_folder = tournaments_folder
 
     def execute(self):
-        # Load tournaments from the specified folder
-        tournaments = Tournament.load_tournaments_from_folder(self.tournaments_folder)
-        # Return a Context object with the loaded tournaments and screen name
-        return Context(screen="tournament-menu", tournaments=tournaments)
+        # The index is read from the files: the saves handed to the autosaver are written first
+        autosaver.flush()
+        # List tournaments from the folder index, or the database (players and rounds are loaded on demand)
+        repository = get_storage().tournament_repository(self.tournaments_folder)
+        # Return a Context object with the repository (the screen lists a page at a time)
+        return Context(screen="tournament-menu", repository=repository)
@@ -13,9 +13,16 @@ class PlayerUpdateCmd(BaseCommand):
 
     def execute(self):
         """The command uses the update_player method from the Club model"""
-        if self.player:
-            player = self.club.update_player(self.player, **self.data)
-        else:
-            player = self.club.create_player(**self.data)
+        try:
+            if self.player:
+                player = self.club.update_player(self.player, **self.data)
+            else:
+                player = self.club.create_player(**self.data)
+        except ValueError as e:
+            # Chess ID already used: back to the form
+            print(e)
+            if self.player:
+                return Context("player-edit", club=self.club, player=self.player)
+            return Context("player-create", club=self.club)
 
         return Context("player-view", club=self.club, player=player)
@@ -0,0 +1,52 @@
+"""
+This script allows anyone to create a JSON file for a chess club.
+It will be filled with random members (see models.synthetic), with unique Chess IDs.
+
+Run from the project root: python -m data.make_club "Club Name" --count 1000
+"""
+
+import argparse
+from pathlib import Path
+
+from models.synthetic import write_club
+
+CLUBS_FOLDER = Path(__file__).resolve().parent / "clubs"
+
+
+def make_club(name, fname=None, count=20, seed=None, folder=CLUBS_FOLDER):
+    """Main function to generate a club"""
+    if not fname:
+        # We did not get a file name: generate it
+        fname = name.replace(" ", "") + ".json"
+
+    # The players are written as they are generated
+    write_club(Path(folder) / fname, name, count, seed=name if seed is None else seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create a JSON file for a club.")
+    # Club name (required)
+    parser.add_argument("clubname", type=str, help="club name")
+    # File name (not required)
+    parser.add_argument("filename", type=str, nargs="?", help="JSON file name")
+    # Number of players (not required)
+    parser.add_argument(
+        "--count", type=int, default=20, help="Number of players to generate"
+    )
+    # Random seed (not required): the same seed gives the same players
+    parser.add_argument(
+        "--seed", type=str, help="Random seed (the club name by default)"
+    )
+    # Folder of the file (not required)
+    parser.add_argument(
+        "--folder", default=CLUBS_FOLDER, help="Folder of the JSON file"
+    )
+
+    args = parser.parse_args()
+    make_club(
+        name=args.clubname,
+        fname=args.filename,
+        count=args.count,
+        seed=args.seed,
+        folder=args.folder,
+    )
@@ -9,6 +9,11 @@ from screens import (
     TournamentMenu,
 )
 from pathlib import Path
+import argparse
+
+from models.autosave import autosaver
+from models.club import ChessClub
+from models.profiling import enable_from_env, profiler
 
 
 class App:
@@ -60,12 +65,25 @@ class App:
                 print("Invalid choice. Please try again.")
 
     def run(self):
-        while self.context is not False:
+        # The saves are written in the background, and the changes to a club are grouped (see
+        # ChessClub.changed); what is pending is written before leaving
+        ChessClub.write_behind = True
+        autosaver.start()
+        try:
+            self.run_screens()
+        finally:
+            ChessClub.commit_all()
+            autosaver.stop()
+
+    def run_screens(self):
+        while self.context is not False and self.context.run:
             # Get the screen class from the mapping
             screen = self.SCREENS[self.context.screen]
             try:
-                # Run the screen and get the command
-                command = screen(**self.context.kwargs).run()
+                # Run the screen and get the command (the span includes the time spent waiting
+                # for the user)
+                with profiler.span(screen.__name__, "screen"):
+                    command = screen(**self.context.kwargs).run()
                 # Check if the command is a callable
                 if callable(command):
                     # Run the command and get a context back
@@ -80,5 +98,21 @@ class App:
 
 
 if __name__ == "__main__":
-    app = App()
-    app.run()
+    parser = argparse.ArgumentParser(description="Manages chess clubs and tournaments.")
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="Profiles the session: Chrome trace if FILE ends with .json, "
+        "cProfile dump otherwise",
+    )
+    args = parser.parse_args()
+    if args.profile:
+        profiler.enable(args.profile)
+    else:
+        enable_from_env()
+
+    try:
+        app = App()
+        app.run()
+    finally:
+        profiler.finish()
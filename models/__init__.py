@@ -1,7 +1,26 @@
 from .club import ChessClub
+from .club_cache import ClubCache
 from .club_manager import ClubManager
+from .pairing_worker import NextRoundPairing
 from .player import Player
+from .simulation import TournamentSimulator
+from .storage import JSONStorage, Storage, get_storage
 from .tournament import Tournament
 from .tournament_operation import TournamentOperations
+from .tournament_repository import TournamentRepository, TournamentSummary
 
-__all__ = ["Player", "ChessClub", "ClubManager", "Tournament", "TournamentOperations"]
+__all__ = [
+    "Player",
+    "ChessClub",
+    "ClubManager",
+    "ClubCache",
+    "Tournament",
+    "TournamentOperations",
+    "NextRoundPairing",
+    "TournamentSimulator",
+    "TournamentRepository",
+    "TournamentSummary",
+    "Storage",
+    "JSONStorage",
+    "get_storage",
+]
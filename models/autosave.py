@@ -0,0 +1,100 @@
+"""
+Background saving, so that the screens never wait for the disk.
+
+The application starts the autosaver of the process (autosaver.start()); the models then hand
+their saves over to it with submit(key, write), where key is the file written. The writes are
+done one after another by a single writer thread, and a write requested for a file that is
+still waiting replaces the one before it: the file is written once, with the latest data.
+flush() waits for the writes requested so far, and stop() flushes and ends the thread.
+
+When the autosaver is not started (scripts, benchmarks), write() is called right away.
+"""
+
+import threading
+
+
+class AutoSaver:
+    def __init__(self):
+        self.condition = threading.Condition()
+        # Writes waiting for the writer thread, by key, in the order they were first requested
+        self.pending = {}
+        # Key of the write in progress
+        self.writing = None
+        self.stopping = False
+        self.thread = None
+        # Number of writes requested, and actually done
+        self.requested = 0
+        self.written = 0
+
+    @property
+    def running(self):
+        return self.thread is not None
+
+    def start(self):
+        with self.condition:
+            if self.thread is not None:
+                return
+            self.stopping = False
+            self.thread = threading.Thread(target=self._work, name="autosave")
+            self.thread.daemon = True
+            self.thread.start()
+
+    def submit(self, key, write):
+        """Requests a write: write() is called in the writer thread (right away if it is stopped)"""
+        with self.condition:
+            self.requested += 1
+            if self.thread is not None:
+                self.pending[key] = write
+                self.condition.notify_all()
+                return
+        write()
+        with self.condition:
+            self.written += 1
+
+    def is_pending(self, key):
+        """True when a write of key is waiting for the writer thread"""
+        with self.condition:
+            return key in self.pending
+
+    def _work(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.stopping)
+                if not self.pending:
+                    return
+                key = next(iter(self.pending))
+                write = self.pending.pop(key)
+                self.writing = key
+
+            try:
+                write()
+            except Exception as e:
+                print(f"Could not save {key}: {e}")
+            finally:
+                with self.condition:
+                    self.writing = None
+                    self.written += 1
+                    self.condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Waits for the writes requested so far; returns False if they were not done in time"""
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: not self.pending and self.writing is None, timeout
+            )
+
+    def stop(self):
+        """Writes what is pending, then ends the writer thread"""
+        with self.condition:
+            thread = self.thread
+            if thread is None:
+                return
+            self.stopping = True
+            self.condition.notify_all()
+        thread.join()
+        with self.condition:
+            self.thread = None
+
+
+# The autosaver of the process
+autosaver = AutoSaver()
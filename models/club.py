@@ -1,6 +1,18 @@
-import json
+import threading
+from contextlib import contextmanager
 
+from .autosave import autosaver
+from .files import file_stat, write_json_atomic
+from .loader import iter_club_players, read_club_header
 from .player import Player
+from .profiling import profiled
+from .search import SearchIndex
+from .streaming import BackgroundReader
+
+
+def player_texts(player):
+    """Texts of a player indexed for search"""
+    return player.name, player.email, player.chess_id
 
 
 class ChessClub:
@@ -8,56 +20,265 @@ class ChessClub:
     A local chess club.
 
     Data is loaded from a JSON file (provided as argument).
-    The class creates Player instances based on JSON data.
+    The class creates Player instances based on JSON data: they are streamed from the file, in a
+    background thread, when they are first needed (see iter_players).
+
+    Changes are saved right away, unless the club is in write-behind mode: changes are then
+    saved after FLUSH_THRESHOLD changes, FLUSH_INTERVAL seconds, or an explicit commit().
+    In both modes, the changes made within a batch() block are saved once, at the end of the block.
+    Write-behind is on for all the clubs when ChessClub.write_behind is set (the application
+    does), and commit_all() saves the clubs whose changes are still waiting (before leaving).
+
+    A club kept in a storage backend (see models.storage) is saved to it instead of a JSON file,
+    and its players are only read from it when they are first needed.
     """
 
-    def __init__(self, filepath=None, name=None):
-        """The constructor works in two ways:
-        - if the filepath is provided, it loads data from JSON
+    # Write-behind mode: number of changes, and delay (in seconds), before the club is saved
+    FLUSH_THRESHOLD = 100
+    FLUSH_INTERVAL = 5.0
+    # Persistence mode of the clubs that do not set their own
+    write_behind = False
+    # Clubs with changes waiting for the timer or the end of a batch
+    unsaved = set()
+    unsaved_lock = threading.Lock()
+
+    def __init__(self, filepath=None, name=None, write_behind=None, storage=None):
+        """The constructor works in three ways:
+        - if a storage is provided, the club is kept in it (storage_key is its key there)
+        - if the filepath is provided, it loads data from JSON (the players are read on demand)
         - if it is not but a name is provided, it creates a new club (and a new JSON file)
         """
 
         self.name = name
         self.filepath = filepath
-        self.players = []
-
-        if filepath and not name:
-            # Load data from the JSON file
-            with open(filepath) as fp:
-                data = json.load(fp)
-                self.name = data["name"]
-                self.players = [
-                    Player(**player_dict) for player_dict in data["players"]
-                ]
+        self.storage = storage
+        self.storage_key = None
+        self._players = []
+        if write_behind is not None:
+            self.write_behind = write_behind
+        # Number of changes not saved yet
+        self.dirty = 0
+        self.batch_depth = 0
+        self.timer = None
+        self.lock = threading.RLock()
+        # Players by Chess ID, kept up to date by create_player and update_player
+        self._index = {}
+        # Search index of the players, built by the first search (see search_index)
+        self._search_index = None
+        # Background reader of the players of the file
+        self._reader = None
+        # Modification time and size of the file when it was last read or saved (see ClubCache)
+        self.file_stat = None
+
+        if storage is not None:
+            # Read from the storage when first needed
+            self._players = None
+        elif filepath and not name:
+            # Load the name from the JSON file, and the players when first needed
+            _, self.name = read_club_header(filepath)
+            self._players = None
         elif not filepath:
             # We did not have a file, so we are going to create it by running the save method
             self.save()
 
+    def _load_players(self):
+        with self.lock:
+            if self._players is None:
+                if self.storage is not None:
+                    self.set_players(self.storage.load_players(self))
+                else:
+                    self.set_players(self.start_loading().result())
+
+    def start_loading(self):
+        """Starts reading the players from the file in a background thread (once)"""
+        with self.lock:
+            if self._reader is None:
+                self._reader = BackgroundReader(iter_club_players(self.filepath))
+            return self._reader
+
+    def iter_players(self):
+        """Yields the players; those of a file are yielded as they are read"""
+        if self._players is None and self.storage is None:
+            yield from self.start_loading()
+        else:
+            yield from self.players
+
+    @property
+    def players(self):
+        self._load_players()
+        return self._players
+
+    @players.setter
+    def players(self, players):
+        self._players = players
+
+    @property
+    def index(self):
+        """Players by Chess ID"""
+        self._load_players()
+        return self._index
+
+    @property
+    def search_index(self):
+        """Index of the players by name, email and Chess ID (keys are the Chess IDs)"""
+        with self.lock:
+            if self._search_index is None:
+                search_index = SearchIndex()
+                for chess_id, player in self.index.items():
+                    search_index.add(chess_id, player_texts(player))
+                search_index.sort_words()
+                self._search_index = search_index
+            return self._search_index
+
+    def search(self, query, limit=20):
+        """Players matching the query (name, email or Chess ID, prefixes and typos allowed)"""
+        chess_ids = self.search_index.search(query, limit)
+        return [self.index[chess_id] for chess_id in chess_ids]
+
+    @profiled("io")
     def save(self):
-        """Serializes the players and saves the club info to the JSON file"""
+        """Serializes the players and saves the club info to the JSON file (or the storage)"""
 
-        with open(self.filepath, "w") as fp:
-            json.dump(
-                {"name": self.name, "players": [p.serialize() for p in self.players]},
-                fp,
-            )
+        with self.lock:
+            if self.storage is not None:
+                self.storage.save_club(self)
+            else:
+                write_json_atomic(
+                    self.filepath,
+                    {
+                        "name": self.name,
+                        "players": [p.serialize() for p in self.players],
+                    },
+                )
+                self.file_stat = file_stat(self.filepath)
+            self.dirty = 0
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            with ChessClub.unsaved_lock:
+                ChessClub.unsaved.discard(self)
+
+    def save_later(self):
+        """
+        Hands the save over to the autosaver (see models.autosave): the club is saved in the
+        background, once for all the changes made until then. Saved right away when the
+        autosaver is not running, or when the club is kept in a storage.
+        """
+        if self.storage is not None:
+            self.save()
+        else:
+            autosaver.submit(str(self.filepath), self.commit)
+
+    def commit(self):
+        """Saves the club if there are unsaved changes"""
+        with self.lock:
+            if self.dirty:
+                self.save()
+
+    def changed(self):
+        """Records a change and saves the club, now or later depending on the persistence mode"""
+        with self.lock:
+            self.dirty += 1
+            if self.batch_depth:
+                self._wait_for_save()
+                return
+            if not self.write_behind or self.dirty >= self.FLUSH_THRESHOLD:
+                self.save_later()
+            elif self.timer is None:
+                self._wait_for_save()
+                self.timer = threading.Timer(self.FLUSH_INTERVAL, self.save_later)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def _wait_for_save(self):
+        # Kept until saved: the timer is a daemon thread, it does not run at exit
+        with ChessClub.unsaved_lock:
+            ChessClub.unsaved.add(self)
+
+    @classmethod
+    def commit_all(cls):
+        """Saves the clubs whose changes are waiting for their timer"""
+        with cls.unsaved_lock:
+            clubs = list(cls.unsaved)
+        for club in clubs:
+            club.commit()
+
+    @contextmanager
+    def batch(self):
+        """Context manager for bulk edits: the changes made in the block are saved once, at the end"""
+        with self.lock:
+            self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.batch_depth -= 1
+                if not self.batch_depth:
+                    self.commit()
+
+    @classmethod
+    def from_header(cls, filepath, name):
+        """Creates the club of an existing file whose players are not read yet"""
+        club = cls(filepath=filepath, name=name)
+        club._players = None
+        return club
+
+    @classmethod
+    def from_players(cls, filepath, name, players):
+        """Creates the club of an existing file, from players already loaded"""
+        club = cls(filepath=filepath, name=name)
+        club.set_players(players)
+        return club
+
+    def set_players(self, players):
+        self.players = players
+        # Reversed, so the first player with a Chess ID wins
+        self._index = {p.chess_id: p for p in reversed(players)}
+        self._search_index = None
+
+    def get_player(self, chess_id):
+        """Returns the player with this Chess ID (None if there is none)"""
+        return self.index.get(chess_id)
 
     def create_player(self, **kwargs):
         """Utility method to create a new player instance and add it to the club"""
 
         player = Player(**kwargs)
-        self.players.append(player)
-        self.save()
+        if player.chess_id in self.index:
+            raise ValueError(
+                f"Chess ID {player.chess_id} already used in club {self.name}!"
+            )
+        with self.lock:
+            self.players.append(player)
+            self.index[player.chess_id] = player
+            if self._search_index is not None:
+                self._search_index.add(player.chess_id, player_texts(player))
+            self.changed()
         return player
 
     def update_player(self, player, **kwargs):
         """Utility method to update a player instance based on arguments provided"""
 
-        if player not in self.players:
-            raise RuntimeError(f"Player {player} not in club {self.name}!")
+        current = self.index.get(player.chess_id)
+        if current is not player:
+            # The players read from a storage page are copies of the ones of the club
+            if self.storage is None or current is None or current != player:
+                raise RuntimeError(f"Player {player} not in club {self.name}!")
+            player = current
 
-        for key, value in kwargs.items():
-            setattr(player, key, value)
+        chess_id = kwargs.get("chess_id", player.chess_id)
+        if chess_id != player.chess_id and chess_id in self.index:
+            raise ValueError(f"Chess ID {chess_id} already used in club {self.name}!")
 
-        self.save()
+        with self.lock:
+            if chess_id != player.chess_id:
+                del self.index[player.chess_id]
+                self.index[chess_id] = player
+            if self._search_index is not None:
+                self._search_index.remove(player.chess_id)
+            for key, value in kwargs.items():
+                setattr(player, key, value)
+            if self._search_index is not None:
+                self._search_index.add(player.chess_id, player_texts(player))
+            self.changed()
         return player
@@ -0,0 +1,91 @@
+import os
+import threading
+
+from .club import ChessClub
+from .files import file_stat
+from .loader import Loader, LoadResult, read_club_header
+
+
+class ClubCache:
+    """
+    Clubs loaded from JSON files, kept for the whole process.
+
+    A file is only read again when its modification time or size changed: otherwise, the
+    ChessClub already loaded is returned as is (with its players, if they were read). The clubs
+    record the stat of their file when they save it, so the changes made by the application do
+    not count as changes on disk. Files that could not be read are remembered the same way.
+    hits and misses count the files found in the cache and the files read.
+    """
+
+    def __init__(self):
+        # Absolute path -> club, and absolute path -> (stat, exception) for the failed files
+        self.clubs = {}
+        self.failed = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def load(self, paths, loader=None) -> LoadResult:
+        """Clubs of the files, in their order; the files that could not be read are in errors"""
+        paths = list(paths)
+        keys = [os.path.abspath(path) for path in paths]
+        with self.lock:
+            stats = {}
+            stale = []
+            for path, key in zip(paths, keys):
+                stat = file_stat(path)
+                club = self.clubs.get(key)
+                failed = self.failed.get(key)
+                if stat is not None and (
+                    (club is not None and club.file_stat == stat)
+                    or (failed is not None and failed[0] == stat)
+                ):
+                    self.hits += 1
+                    continue
+                self.misses += 1
+                stats[key] = stat
+                stale.append(path)
+
+            loaded = (loader or Loader()).load(stale, read_club_header)
+            for filepath, name in loaded.items:
+                key = os.path.abspath(filepath)
+                club = ChessClub.from_header(filepath, name)
+                club.file_stat = stats[key]
+                self.clubs[key] = club
+                self.failed.pop(key, None)
+            for filepath, error in loaded.errors:
+                key = os.path.abspath(filepath)
+                self.failed[key] = (stats[key], error)
+                self.clubs.pop(key, None)
+
+            # Forget the files that are gone
+            current = set(keys)
+            for cached in (self.clubs, self.failed):
+                for key in cached.keys() - current:
+                    del cached[key]
+
+            result = LoadResult()
+            for path, key in zip(paths, keys):
+                if key in self.clubs:
+                    result.items.append(self.clubs[key])
+                else:
+                    result.errors.append((path, self.failed[key][1]))
+            return result
+
+    def add(self, club):
+        """Adds a club that was just saved (created) by the application"""
+        with self.lock:
+            key = os.path.abspath(club.filepath)
+            self.clubs[key] = club
+            self.failed.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.clubs.clear()
+            self.failed.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# The cache of the process, shared by the JSON storages
+club_cache = ClubCache()
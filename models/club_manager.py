@@ -1,25 +1,22 @@
-import json
 from pathlib import Path
 
-from .club import ChessClub
+from .storage import JSONStorage
 
 
 class ClubManager:
-    def __init__(self, data_folder="data/clubs"):
-        datadir = Path(data_folder)
-        self.data_folder = datadir
-        self.clubs = []
-        for filepath in datadir.iterdir():
-            if filepath.is_file() and filepath.suffix == ".json":
-                try:
-                    self.clubs.append(ChessClub(filepath))
-                except json.JSONDecodeError:
-                    print(filepath, "is invalid JSON file.")
+    def __init__(self, data_folder="data/clubs", loader=None, storage=None):
+        # Without a storage, the clubs are the JSON files of data_folder
+        if storage is None:
+            storage = JSONStorage(clubs_folder=data_folder, loader=loader)
+        self.storage = storage
+        self.data_folder = Path(data_folder)
+
+        # The clubs that could not be loaded are kept in errors
+        self.clubs = storage.load_clubs()
+        self.errors = storage.errors
 
     def create(self, name):
-        filepath = self.data_folder / (name.replace(" ", "") + ".json")
-        club = ChessClub(name=name, filepath=filepath)
-        club.save()
+        club = self.storage.create_club(name)
 
         self.clubs.append(club)
         return club
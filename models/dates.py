@@ -0,0 +1,46 @@
+"""
+Date codec shared by the models and screens.
+
+Dates are written as DD-MM-YYYY strings in the JSON files and stored in memory as day ordinals
+(see date.toordinal). Parsing takes a precompiled regular expression fast path (strptime is only
+used for the unusual spellings it accepts, like single-digit days) and is cached, as the same
+dates come up again and again (birthdays, tournament dates shown in sorted lists).
+"""
+
+import re
+from datetime import date, datetime
+from functools import lru_cache
+
+DATE_FORMAT = "%d-%m-%Y"
+
+_DATE_RE = re.compile(r"(\d{2})-(\d{2})-(\d{4})\Z")
+
+
+@lru_cache(maxsize=8192)
+def parse_ordinal(value: str) -> int:
+    """Day ordinal of a DD-MM-YYYY string; raises ValueError if it is not a valid date"""
+    match = _DATE_RE.match(value)
+    if match is None:
+        return datetime.strptime(value, DATE_FORMAT).toordinal()
+    day, month, year = match.groups()
+    return date(int(year), int(month), int(day)).toordinal()
+
+
+@lru_cache(maxsize=8192)
+def format_ordinal(ordinal: int) -> str:
+    """DD-MM-YYYY string of a day ordinal"""
+    day = date.fromordinal(ordinal)
+    return f"{day.day:02d}-{day.month:02d}-{day.year:04d}"
+
+
+def parse_date(value: str) -> datetime:
+    """datetime of a DD-MM-YYYY string; raises ValueError if it is not a valid date"""
+    return datetime.fromordinal(parse_ordinal(value))
+
+
+def sort_ordinal(value: str) -> int:
+    """Day ordinal to sort by: invalid or empty dates come first (0)"""
+    try:
+        return parse_ordinal(value) if value else 0
+    except (TypeError, ValueError):
+        return 0
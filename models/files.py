@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no advisory locks
+    fcntl = None
+
+
+def file_stat(filepath):
+    """Modification time (in nanoseconds) and size of a file, or None if it cannot be read"""
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@contextmanager
+def file_lock(lock_path):
+    """
+    Holds an exclusive advisory lock (fcntl) on lock_path during the block: the processes using
+    the same lock file take turns. The lock file is created if needed, and kept.
+    Without fcntl (Windows), nothing is locked.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(lock_path, "a") as fp:
+        fcntl.flock(fp.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fp.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def open_atomic(filepath):
+    """
+    Opens a temporary file next to filepath for writing; at the end of the block, it is flushed
+    to disk and renamed over filepath. Readers either see the old or the new content, never a
+    partially written file, and the new content survives a crash once the block is done.
+    """
+    filepath = Path(filepath)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as fp:
+            yield fp
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    sync_folder(filepath.parent)
+
+
+def sync_folder(folder):
+    """Flushes a folder to disk, so that a file renamed in it survives a crash (POSIX only)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_json_atomic(filepath, data, **kwargs):
+    """
+    Writes data as JSON to filepath, atomically (see open_atomic).
+    Extra keyword arguments are passed to json.dump.
+    """
+    with open_atomic(filepath) as fp:
+        json.dump(data, fp, **kwargs)
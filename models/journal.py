@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+from .files import open_atomic
+
+
+class TournamentJournal:
+    """
+    Append-only log of the changes made to a tournament since its JSON file was last written.
+
+    Each change is one compact JSON record per line (JSON Lines), so recording it costs the same
+    whatever the size of the tournament. The records are replayed on top of the JSON file when the
+    tournament is loaded, and the journal is cleared when the tournament is saved in full (compaction).
+
+    When the file is written in the background (see models.autosave), changes can be recorded
+    while it is being written: position is taken with the data to write, and drop(position)
+    then only removes the records written to the file.
+
+    Several processes can share a journal (see Tournament.shared): offset is the end of the
+    records applied so far, and read_new() returns the records appended since by the others.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        # Number of records in the journal (known once it has been read or written)
+        self.count = 0
+        # Number of records removed from the journal since it was read
+        self.dropped = 0
+        # Size of the journal file read or written so far (in bytes)
+        self.offset = 0
+        self.lock = threading.Lock()
+
+    @property
+    def position(self):
+        """Number of records recorded since the journal was read (dropped ones included)"""
+        return self.dropped + self.count
+
+    def append(self, record):
+        with self.lock:
+            with open(self.filepath, "a") as fp:
+                fp.write(json.dumps(record, separators=(",", ":")) + "\n")
+                self.offset = fp.tell()
+            self.count += 1
+
+    def _records(self, offset=0):
+        """Yields the records from offset, and moves offset to the end of the last one read"""
+        with open(self.filepath, "rb") as fp:
+            fp.seek(offset)
+            for line in fp:
+                if not line.endswith(b"\n"):
+                    # Being written by another process: read next time
+                    break
+                self.offset = fp.tell()
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Ignoring invalid record in journal {self.filepath}")
+                    continue
+                yield record
+
+    def read(self):
+        """Yields the records of the journal; a truncated last line (interrupted write) is ignored"""
+        self.count = 0
+        self.dropped = 0
+        self.offset = 0
+        if not self.filepath.exists():
+            return
+
+        for record in self._records():
+            self.count += 1
+            yield record
+
+    def read_new(self):
+        """Records appended to the journal (by other processes) since it was last read or written"""
+        if not self.filepath.exists():
+            self.offset = 0
+            return []
+
+        records = list(self._records(self.offset))
+        self.count += len(records)
+        return records
+
+    def clear(self):
+        with self.lock:
+            self._clear()
+
+    def _clear(self):
+        if self.filepath.exists():
+            os.remove(self.filepath)
+        self.dropped += self.count
+        self.count = 0
+        self.offset = 0
+
+    def drop(self, position):
+        """Removes the records recorded before position (they were written to the tournament file)"""
+        with self.lock:
+            count = position - self.dropped
+            if count <= 0:
+                return
+            if count >= self.count:
+                self._clear()
+                return
+
+            # The records recorded since are kept
+            kept = list(self._records())[count:]
+            with open_atomic(self.filepath) as fp:
+                for record in kept:
+                    fp.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self.dropped += count
+            self.count = len(kept)
+            self.offset = self.filepath.stat().st_size
@@ -0,0 +1,99 @@
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Tuple
+
+from .player import Player
+from .streaming import stream_events
+
+
+@dataclass
+class LoadResult:
+    """Results of a Loader, in the order of the files; files that failed are in errors instead"""
+
+    items: List[Any] = field(default_factory=list)
+    errors: List[Tuple[Path, Exception]] = field(default_factory=list)
+
+
+class Loader:
+    """
+    Loads many files concurrently.
+
+    By default, files are read and parsed in a thread pool (the time goes into I/O on slow or
+    networked drives). With use_processes=True, they are parsed in a process pool instead, which
+    also spreads the CPU work (JSON decoding, building players) over several cores.
+    With max_workers=1, files are loaded one after another in the current thread.
+    """
+
+    def __init__(self, max_workers=None, use_processes=False):
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+
+    def load(self, paths: Iterable[Path], read: Callable) -> LoadResult:
+        """Calls read(path) for each path; read must be a module-level function to use processes"""
+        paths = list(paths)
+        result = LoadResult()
+
+        if self.max_workers == 1 or len(paths) < 2:
+            for path in paths:
+                try:
+                    result.items.append(read(path))
+                except Exception as e:
+                    result.errors.append((path, e))
+            return result
+
+        executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(read, path) for path in paths]
+            for path, future in zip(paths, futures):
+                try:
+                    result.items.append(future.result())
+                except Exception as e:
+                    result.errors.append((path, e))
+
+        return result
+
+
+def json_files(folder):
+    """JSON files of a folder, sorted by name so the loading order does not depend on the file system"""
+    return sorted(
+        path
+        for path in Path(folder).iterdir()
+        if path.is_file() and path.suffix == ".json"
+    )
+
+
+def read_json(filepath):
+    with open(filepath) as fp:
+        return filepath, json.load(fp)
+
+
+def iter_club_players(filepath):
+    """Yields the players of a club file, as they are read"""
+    for kind, key, value in stream_events(filepath, ("players",)):
+        if kind == "item":
+            yield Player(**value)
+
+
+def read_club(filepath):
+    """Reads a club file: returns the file path, the club name and its players"""
+    name = None
+    players = []
+    for kind, key, value in stream_events(filepath, ("players",)):
+        if kind == "item":
+            players.append(Player(**value))
+        elif key == "name":
+            name = value
+    if name is None:
+        raise KeyError("name")
+    return filepath, name, players
+
+
+def read_club_header(filepath):
+    """Reads the name of a club file (not its players): returns the file path and the name"""
+    # The file is only read up to the name
+    for kind, key, value in stream_events(filepath, ("players",)):
+        if kind == "field" and key == "name":
+            return filepath, value
+    raise KeyError("name")
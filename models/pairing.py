@@ -0,0 +1,178 @@
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Maximum number of backtracking steps spent on a single score group before falling back to a greedy pairing
+BACKTRACK_LIMIT = 2000
+
+
+def player_points(player):
+    """Points of a player, given as a PlayerDetails or a dict"""
+    return player["points"] if isinstance(player, dict) else player.points
+
+
+def player_chess_id(player):
+    """Chess ID of a player, given as a PlayerDetails or a dict"""
+    return player["chess_id"] if isinstance(player, dict) else player.chess_id
+
+
+def add_points(player, points):
+    """Adds points to a player, given as a PlayerDetails or a dict"""
+    if isinstance(player, dict):
+        player["points"] += points
+    else:
+        player.points += points
+
+
+class SwissPairingEngine:
+    """
+    Swiss system pairing.
+
+    Players are ranked by points (ties keep the order of the given list) and split into score groups.
+    Each group is paired in rank order (#1 with #2, #3 with #4...), with a bounded backtracking search
+    to avoid rematches. Players that cannot be paired in their group float down to the next one.
+    When the number of players is odd, the lowest ranked player that has not had a bye yet gets it.
+    """
+
+    def __init__(
+        self,
+        previous_pairings: Optional[Iterable[Tuple[str, str]]] = None,
+        byes: Optional[Iterable[str]] = None,
+        backtrack_limit: int = BACKTRACK_LIMIT,
+    ):
+        self.opponents: Dict[str, Set[str]] = {}
+        for player1_id, player2_id in previous_pairings or ():
+            self.add_pairing(player1_id, player2_id)
+        self.byes = set(byes or ())
+        self.backtrack_limit = backtrack_limit
+
+    def add_pairing(self, player1_id, player2_id):
+        self.opponents.setdefault(player1_id, set()).add(player2_id)
+        self.opponents.setdefault(player2_id, set()).add(player1_id)
+
+    def have_played(self, player1_id, player2_id):
+        return player2_id in self.opponents.get(player1_id, ())
+
+    def pair(self, players) -> List[Tuple[object, Optional[object]]]:
+        """Returns the pairings for the next round; the bye (if any) is the last pairing, as (player, None)"""
+        ranked = sorted(players, key=player_points, reverse=True)
+
+        bye = None
+        if len(ranked) % 2:
+            bye = self.pick_bye(ranked)
+            ranked = [p for p in ranked if p is not bye]
+
+        # Pairs of each score group, from the highest
+        group_pairs = []
+        floaters = []
+        for _, group in groupby(ranked, key=player_points):
+            pairs, floaters = self.pair_group(floaters + list(group))
+            group_pairs.append(pairs)
+
+        if floaters:
+            # Nobody is left to float down to
+            self.pair_leftovers(group_pairs, floaters)
+        pairings = [pair for pairs in group_pairs for pair in pairs]
+
+        for player1, player2 in pairings:
+            self.add_pairing(player_chess_id(player1), player_chess_id(player2))
+
+        if bye is not None:
+            self.byes.add(player_chess_id(bye))
+            pairings.append((bye, None))
+
+        return pairings
+
+    def pair_leftovers(self, group_pairs, floaters):
+        """
+        Pairs the players left at the bottom: they are paired again with the lowest score groups
+        (widening upward, one group at a time) until a pairing without rematches is found.
+        Only when there is none do they meet players they already played.
+        """
+        players = list(floaters)
+        for k in range(len(group_pairs) - 1, -1, -1):
+            players = sorted(
+                [player for pair in group_pairs[k] for player in pair] + players,
+                key=player_points,
+                reverse=True,
+            )
+            matches = self.match(players)
+            if matches is not None:
+                group_pairs[k:] = [matches]
+                return
+
+        group_pairs.append(
+            [(floaters[i], floaters[i + 1]) for i in range(0, len(floaters), 2)]
+        )
+
+    def pick_bye(self, ranked):
+        for player in reversed(ranked):
+            if player_chess_id(player) not in self.byes:
+                return player
+        # Everybody already had a bye
+        return ranked[-1]
+
+    def pair_group(self, group):
+        """Pairs a score group; returns the pairs and the players floating down to the next group"""
+        if len(group) % 2 == 0:
+            matches = self.match(group)
+            if matches is not None:
+                return matches, []
+        else:
+            # The floater is preferably the lowest ranked player of the group
+            for floater in range(len(group) - 1, max(len(group) - 4, -1), -1):
+                matches = self.match(group[:floater] + group[floater + 1:])
+                if matches is not None:
+                    return matches, [group[floater]]
+
+        return self.match_greedy(group)
+
+    def match(self, group):
+        """
+        Pairs all the players of the group, in order, without rematches.
+        Returns None when no such pairing was found within the backtracking limit.
+        """
+        ids = [player_chess_id(p) for p in group]
+        size = len(group)
+        used = [False] * size
+        stack = []
+        steps = 0
+
+        i = 0
+        start = 1
+        while i < size:
+            j = start
+            while j < size and (used[j] or self.have_played(ids[i], ids[j])):
+                j += 1
+
+            if j < size:
+                used[i] = used[j] = True
+                stack.append((i, j))
+                while i < size and used[i]:
+                    i += 1
+                start = i + 1
+            else:
+                steps += 1
+                if not stack or steps > self.backtrack_limit:
+                    return None
+                i, j = stack.pop()
+                used[i] = used[j] = False
+                start = j + 1
+
+        return [(group[i], group[j]) for i, j in stack]
+
+    def match_greedy(self, group):
+        """Pairs each player with the next available opponent it has not played; the others float down"""
+        ids = [player_chess_id(p) for p in group]
+        used = [False] * len(group)
+        pairs = []
+
+        for i in range(len(group)):
+            if used[i]:
+                continue
+            for j in range(i + 1, len(group)):
+                if not used[j] and not self.have_played(ids[i], ids[j]):
+                    used[i] = used[j] = True
+                    pairs.append((group[i], group[j]))
+                    break
+
+        return pairs, [p for p, paired in zip(group, used) if not paired]
@@ -0,0 +1,111 @@
+import threading
+
+from .pairing import player_chess_id, player_points
+from .tournament_operation import TournamentOperations
+
+
+class NextRoundPairing:
+    """
+    Pairs the next round of a tournament in a background thread, while the results of the
+    current round are entered.
+
+    update() is called after each result is recorded (or corrected): it takes a snapshot of the
+    points and of the pairing history, and the thread pairs it. Only the latest snapshot is
+    paired (older requests are dropped), and a pairing made from older results is never
+    returned. When the last result of the round is in, matches() gives the pairing at once, or
+    waits for the thread to finish it.
+    """
+
+    def __init__(self, tournament):
+        self.tournament = tournament
+        self.condition = threading.Condition()
+        # Incremented by each update: the pairing of an older generation is out of date
+        self.generation = 0
+        # Snapshot to pair next, as (generation, players, previous pairings, byes)
+        self.request = None
+        # Latest pairing, as (generation, matches)
+        self.result = None
+        self.error = None
+        # True when there are results the pairing was not taken for yet
+        self.pending = False
+        self.stopped = False
+        self.thread = None
+
+    def update(self):
+        """Pairs the next round again, from the current results"""
+        tournament = self.tournament
+        # Copied here: the players and rounds keep changing while the thread pairs them
+        players = [
+            {"chess_id": player_chess_id(player), "points": player_points(player)}
+            for player in tournament.registered_players
+        ]
+        previous_pairings = set()
+        byes = TournamentOperations.pairing_history(tournament, previous_pairings)
+
+        with self.condition:
+            self.generation += 1
+            self.pending = True
+            self.request = (self.generation, players, previous_pairings, byes)
+            self.condition.notify_all()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._work, daemon=True)
+                self.thread.start()
+
+    def _work(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.request or self.stopped)
+                if self.stopped:
+                    return
+                generation, players, previous_pairings, byes = self.request
+                self.request = None
+
+            try:
+                matches = TournamentOperations.pairing_matches(
+                    TournamentOperations.generate_swiss_pairings(
+                        players, previous_pairings, byes
+                    )
+                )
+                error = None
+            except Exception as e:
+                matches, error = None, e
+
+            with self.condition:
+                if generation == self.generation:
+                    self.result = (generation, matches)
+                    self.error = error
+                self.condition.notify_all()
+
+    def ready(self):
+        """True when the pairing of the current results is done"""
+        with self.condition:
+            return self.result is not None and self.result[0] == self.generation
+
+    def matches(self, timeout=None):
+        """
+        Matches of the next round for the current results, waiting for the thread if it is still
+        pairing them; None if no result was recorded since the last call (or the pairing failed,
+        or timed out): the round is then paired as usual.
+        """
+        with self.condition:
+            if not self.pending:
+                return None
+            self.condition.wait_for(
+                lambda: self.result is not None and self.result[0] == self.generation,
+                timeout,
+            )
+            if self.result is None or self.result[0] != self.generation:
+                return None
+            if self.error is not None:
+                print(f"Pairing in advance failed: {self.error}")
+                return None
+            # Used once: the next round starts from new results
+            matches = self.result[1]
+            self.result = None
+            self.pending = False
+            return matches
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
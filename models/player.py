@@ -1,10 +1,16 @@
+import sys
 from datetime import datetime
 
+from .dates import DATE_FORMAT, format_ordinal, parse_ordinal
+
 
 class Player:
     """The player class holds all information related to a player"""
 
-    DATE_FORMAT = "%d-%m-%Y"
+    DATE_FORMAT = DATE_FORMAT
+
+    # No instance __dict__: large clubs hold many players
+    __slots__ = ("name", "email", "chess_id", "_birth_ordinal")
 
     def __init__(self, name, email, chess_id, birthday):
         if not name:
@@ -12,11 +18,12 @@ class Player:
 
         self.name = name
         self.email = email
-        self.chess_id = chess_id
+        # Chess IDs are used as keys everywhere: interned, they are stored once (a hand-edited
+        # file may have a number)
+        self.chess_id = sys.intern(str(chess_id))
 
-        # The class uses a private attribute for the birthdate (datetime format)
-        self._birthdate = None
-        # And a public one with a getter/setter for the birthday (str)
+        # The class stores the birthdate as a day ordinal (int)
+        # And has a public birthday with a getter/setter (str)
         self.birthday = birthday
 
     def __str__(self):
@@ -24,29 +31,38 @@ class Player:
 
     def __hash__(self):
         """Returns the hash of the object - useful to use the instance as a key in a dictionary or in a set"""
-        return hash((self.name, self.email, self.chess_id, self.birthdate))
+        return hash((self.name, self.email, self.chess_id, self._birth_ordinal))
 
     def __eq__(self, other):
         """Required when __hash__ is defined"""
         if type(other) is not type(self):
             raise TypeError("'=' is not supported with type %s" % type(other))
 
-        return (self.name, self.email, self.chess_id, self.birthdate) == (
+        return (self.name, self.email, self.chess_id, self._birth_ordinal) == (
             other.name,
             other.email,
             other.chess_id,
-            other.birthdate,
+            other._birth_ordinal,
         )
 
+    @property
+    def birthdate(self):
+        """Property to get the birthdate (datetime) from the day ordinal"""
+        return datetime.fromordinal(self._birth_ordinal)
+
+    @birthdate.setter
+    def birthdate(self, value):
+        self._birth_ordinal = value.toordinal()
+
     @property
     def birthday(self):
-        """Property to get the birthday (string) from the birthdate (datetime)"""
-        return self.birthdate.strftime(self.DATE_FORMAT)
+        """Property to get the birthday (string) from the birthdate"""
+        return format_ordinal(self._birth_ordinal)
 
     @birthday.setter
     def birthday(self, value):
-        """Sets the birthdate (datetime) from a string"""
-        self.birthdate = datetime.strptime(value, self.DATE_FORMAT)
+        """Sets the birthdate from a string"""
+        self._birth_ordinal = parse_ordinal(value)
 
     def serialize(self):
         """Serialize the instance in a format compatible with JSON"""
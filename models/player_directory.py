@@ -0,0 +1,183 @@
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import ClassVar, Dict, List
+
+from .files import write_json_atomic
+from .search import SearchIndex
+from .streaming import stream_events
+
+DIRECTORY_FILENAME = ".player-directory"
+
+TOURNAMENT = "tournament"
+CLUB = "club"
+
+
+@dataclass
+class DirectorySource:
+    """A tournament or club file, with the players it had when it was last read"""
+
+    kind: str
+    name: str
+    filepath: str
+    mtime: float
+    # [chess_id, name, email] for each player, in the order of the file
+    players: List[List[str]]
+
+
+@dataclass
+class PlayerHit:
+    """A player found by a search, and where it was found"""
+
+    kind: str
+    source: str
+    filepath: str
+    chess_id: str
+    name: str
+    email: str
+
+    def __str__(self):
+        name = self.name or "(no name)"
+        return f"{name} (Chess ID: {self.chess_id}) - {self.kind} {self.source}"
+
+
+def read_source(filepath, kind, mtime):
+    """Reads the name and players of a tournament or club file, streaming the players"""
+    name = ""
+    players = []
+    for event, key, value in stream_events(filepath, ("players", "rounds")):
+        if event == "field" and key == "name":
+            name = value
+        elif event == "item" and key == "players":
+            if isinstance(value, str):
+                # Player is represented by chess_id only
+                players.append([value, "", ""])
+            elif isinstance(value, dict):
+                players.append(
+                    [
+                        value.get("chess_id", ""),
+                        value.get("name", ""),
+                        value.get("email", ""),
+                    ]
+                )
+    return DirectorySource(kind, name, str(filepath), mtime, players)
+
+
+class PlayerDirectory:
+    """
+    Finds players across all the tournament and club files.
+
+    The players of each file are kept in a directory file in the data folder, with the modification
+    time of the file: refresh() only reads the files that changed since. Searches go through an
+    in-memory SearchIndex (Chess ID, name and email words, prefixes, typos).
+    """
+
+    directories: ClassVar[Dict[Path, "PlayerDirectory"]] = {}
+
+    def __init__(self, data_folder):
+        self.data_folder = Path(data_folder)
+        self.folders = {
+            TOURNAMENT: self.data_folder / "tournaments",
+            CLUB: self.data_folder / "clubs",
+        }
+        self.index_path = self.data_folder / DIRECTORY_FILENAME
+        self.search_index = SearchIndex()
+        self.sources: Dict[str, DirectorySource] = {}
+        for source in self.read_index():
+            self.add_source(source)
+        self.search_index.sort_words()
+
+    @classmethod
+    def get(cls, data_folder=None):
+        """Returns the directory of a data folder (by default, the one of the application)"""
+        if data_folder is None:
+            data_folder = Path(__file__).resolve().parent.parent / "data"
+        data_folder = Path(data_folder).resolve()
+        if data_folder not in cls.directories:
+            cls.directories[data_folder] = cls(data_folder)
+        return cls.directories[data_folder]
+
+    def read_index(self):
+        try:
+            with open(self.index_path) as fp:
+                entries = json.load(fp)
+        except (OSError, json.JSONDecodeError):
+            return []
+
+        sources = []
+        for entry in entries:
+            try:
+                sources.append(DirectorySource(**entry))
+            except TypeError:
+                # Unknown directory layout: the file will be read again
+                continue
+        return sources
+
+    def write_index(self):
+        write_json_atomic(
+            self.index_path, [asdict(source) for source in self.sources.values()]
+        )
+
+    def add_source(self, source):
+        self.remove_source(source.filepath)
+        self.sources[source.filepath] = source
+        for position, (chess_id, name, email) in enumerate(source.players):
+            self.search_index.add((source.filepath, position), (name, email, chess_id))
+
+    def remove_source(self, filepath):
+        source = self.sources.pop(filepath, None)
+        if source is not None:
+            for position in range(len(source.players)):
+                self.search_index.remove((filepath, position))
+
+    def refresh(self):
+        """Reads the files that were added or changed since the last refresh"""
+        changed = False
+        seen = set()
+
+        for kind, folder in self.folders.items():
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder):
+                if not entry.is_file() or not entry.name.endswith(".json"):
+                    continue
+
+                seen.add(entry.path)
+                mtime = entry.stat().st_mtime
+                source = self.sources.get(entry.path)
+                if source and source.mtime == mtime:
+                    continue
+
+                try:
+                    self.add_source(read_source(entry.path, kind, mtime))
+                except json.JSONDecodeError as e:
+                    print(f"Error loading JSON file {entry.name}: {e}")
+                    self.remove_source(entry.path)
+                changed = True
+
+        for filepath in set(self.sources) - seen:
+            self.remove_source(filepath)
+            changed = True
+
+        if changed:
+            self.search_index.sort_words()
+            self.write_index()
+
+    def search(self, query, limit=20) -> List[PlayerHit]:
+        """Players matching the query (Chess ID, name or email, prefixes and typos allowed)"""
+        hits = []
+        for filepath, position in self.search_index.search(query, limit):
+            source = self.sources[filepath]
+            chess_id, name, email = source.players[position]
+            hits.append(
+                PlayerHit(source.kind, source.name, filepath, chess_id, name, email)
+            )
+        return hits
+
+    def list_sources(self, kind) -> List[DirectorySource]:
+        """Tournament (or club) files, by file name"""
+        return sorted(
+            (source for source in self.sources.values() if source.kind == kind),
+            key=lambda source: Path(source.filepath).name,
+        )
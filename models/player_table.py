@@ -0,0 +1,191 @@
+import sys
+from array import array
+from datetime import datetime
+from weakref import WeakValueDictionary
+
+from .dates import format_ordinal, parse_ordinal
+
+
+def _column(attr):
+    """Property reading/writing one column of the table, for the row of the view"""
+
+    def getter(self):
+        return getattr(self.table, attr)[self.row]
+
+    def setter(self, value):
+        getattr(self.table, attr)[self.row] = value
+
+    return property(getter, setter)
+
+
+class PlayerRow:
+    """
+    Lightweight view on a row of a PlayerTable.
+
+    It offers the attributes and methods of Player and PlayerDetails (name, email, chess_id,
+    birthday, birthdate, points, serialize(), make_dict()), reading and writing the table columns.
+    """
+
+    __slots__ = ("table", "row", "__weakref__")
+
+    name = _column("names")
+    email = _column("emails")
+    points = _column("points")
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    def __repr__(self):
+        return (
+            f"PlayerRow(name={self.name!r}, email={self.email!r}, chess_id={self.chess_id!r}, "
+            f"birthday={self.birthday!r}, points={self.points!r})"
+        )
+
+    @property
+    def chess_id(self):
+        return self.table.chess_ids[self.row]
+
+    @chess_id.setter
+    def chess_id(self, value):
+        self.table.rename(self.row, value)
+
+    @property
+    def birthday(self):
+        return self.table.get_birthday(self.row)
+
+    @birthday.setter
+    def birthday(self, value):
+        self.table.set_birthday(self.row, value)
+
+    @property
+    def birthdate(self):
+        ordinal = self.table.birthdays[self.row]
+        return datetime.fromordinal(ordinal) if ordinal else None
+
+    def serialize(self):
+        return {
+            "name": self.name,
+            "email": self.email,
+            "chess_id": self.chess_id,
+            "birthday": self.birthday,
+        }
+
+    def make_dict(self):
+        data = self.serialize()
+        data["points"] = self.points
+        return data
+
+
+class PlayerTable:
+    """
+    Columnar storage for large rosters.
+
+    Each attribute is a column: Chess IDs are interned strings, birthdays are day ordinals in an
+    array (0 when there is none), and points are floats in an array. The table is a sequence of
+    PlayerRow views; a view is kept for as long as it is referenced, so a row always gets the same one.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.emails = []
+        self.chess_ids = []
+        self.birthdays = array("l")
+        self.points = array("d")
+        # Row number by Chess ID (the first row for a Chess ID wins)
+        self.positions = {}
+        # Birthdays that are not valid dates, kept as they were given
+        self.raw_birthdays = {}
+        self.views = WeakValueDictionary()
+
+    @classmethod
+    def from_entries(cls, entries):
+        """Builds the table from JSON entries: player dicts, or Chess ID strings"""
+        table = cls()
+        for entry in entries:
+            table.add_entry(entry)
+        return table
+
+    def add_entry(self, entry):
+        """Adds a player given as a JSON entry: a player dict, or a Chess ID string"""
+        if isinstance(entry, str):
+            self.add(chess_id=entry)
+        else:
+            self.add(
+                name=entry.get("name", ""),
+                email=entry.get("email", ""),
+                chess_id=entry.get("chess_id", ""),
+                birthday=entry.get("birthday", ""),
+                points=entry.get("points", 0),
+            )
+
+    def add(self, name="", email="", chess_id="", birthday="", points=0.0):
+        """Adds a player to the table and returns its row view"""
+        row = len(self.chess_ids)
+        self.names.append(name)
+        self.emails.append(email)
+        chess_id = sys.intern(str(chess_id))
+        self.chess_ids.append(chess_id)
+        self.birthdays.append(0)
+        self.points.append(points)
+        self.set_birthday(row, birthday)
+        self.positions.setdefault(chess_id, row)
+        return self[row]
+
+    def append(self, player):
+        """Adds a player given as an object (Player, PlayerDetails...), like list.append"""
+        self.add(
+            name=player.name,
+            email=player.email,
+            chess_id=player.chess_id,
+            birthday=player.birthday,
+            points=getattr(player, "points", 0.0),
+        )
+
+    def get_birthday(self, row):
+        ordinal = self.birthdays[row]
+        if ordinal:
+            return format_ordinal(ordinal)
+        return self.raw_birthdays.get(row, "")
+
+    def set_birthday(self, row, value):
+        self.raw_birthdays.pop(row, None)
+        try:
+            self.birthdays[row] = parse_ordinal(value)
+        except (TypeError, ValueError):
+            self.birthdays[row] = 0
+            if value:
+                self.raw_birthdays[row] = value
+
+    def rename(self, row, chess_id):
+        """Changes the Chess ID of a row"""
+        old_chess_id = self.chess_ids[row]
+        if self.positions.get(old_chess_id) == row:
+            del self.positions[old_chess_id]
+        chess_id = sys.intern(str(chess_id))
+        self.chess_ids[row] = chess_id
+        self.positions.setdefault(chess_id, row)
+
+    def get(self, chess_id, default=None):
+        """Returns the view of the player with this Chess ID"""
+        row = self.positions.get(chess_id)
+        return default if row is None else self[row]
+
+    def __len__(self):
+        return len(self.chess_ids)
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("player table index out of range")
+
+        view = self.views.get(row)
+        if view is None:
+            view = PlayerRow(self, row)
+            self.views[row] = view
+        return view
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self[row]
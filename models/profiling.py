@@ -0,0 +1,180 @@
+"""
+Opt-in profiling of a session: wall time and peak memory of the commands, the screens and the
+model I/O calls.
+
+Profiling is enabled by the CASTLE_CHESS_PROFILE environment variable (or the --profile option
+of manage_clubs.py), which gives the output file:
+- a .json file gets a Chrome trace (open it in chrome://tracing or https://ui.perfetto.dev),
+  with a span for each command, screen and I/O call;
+- any other file gets a cProfile dump of the whole session (read it with pstats or snakeviz).
+A summary of the spans is printed when the session ends.
+
+The memory of a span is its peak: the most memory traced (by tracemalloc) during the span,
+above what was traced when it started. A save that builds a large buffer then frees it counts
+the buffer. The peak is the one of the process, so spans running at the same time in other
+threads add to it.
+
+When profiling is disabled, span() and profiled() cost a single attribute check.
+"""
+
+import atexit
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+# Output file of the profile (profiling is disabled when it is not set)
+PROFILE_ENV = "CASTLE_CHESS_PROFILE"
+
+_disabled = nullcontext()
+
+
+class Profiler:
+    """Records spans (name, category, start, duration, peak bytes) while it is enabled"""
+
+    def __init__(self):
+        self.enabled = False
+        self.output = None
+        self.events = []
+        self.cprofile = None
+        self.start = 0
+        # Spans in progress in each thread, as [traced memory at the start, peak seen so far]
+        self.local = threading.local()
+
+    def enable(self, output):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.output = str(output)
+        self.events = []
+        self.start = time.perf_counter_ns()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if not self.output.endswith(".json"):
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        atexit.register(self.finish)
+
+    def span(self, name, category):
+        """Context manager recording a span (a no-op when profiling is disabled)"""
+        if not self.enabled:
+            return _disabled
+        return self._span(name, category)
+
+    @contextmanager
+    def _span(self, name, category):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        current, peak = tracemalloc.get_traced_memory()
+        # The peak is reset for this span: the enclosing one keeps the peak reached so far
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        memory = [current, current]
+        stack.append(memory)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            stack.pop()
+            peak = max(memory[1], tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            self.events.append(
+                (
+                    name,
+                    category,
+                    start,
+                    end - start,
+                    peak - memory[0],
+                    threading.get_ident(),
+                )
+            )
+
+    def finish(self):
+        """Writes the profile and prints the summary (once)"""
+        if not self.enabled:
+            return
+        self.enabled = False
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.output)
+            self.cprofile = None
+        else:
+            self.write_trace()
+        tracemalloc.stop()
+        print(self.summary(), file=sys.stderr)
+        print(f"Profile written to {self.output}", file=sys.stderr)
+
+    def write_trace(self):
+        """Writes the spans in the Chrome trace event format (times in microseconds)"""
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self.start) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": thread,
+                "args": {"peak_bytes": peak},
+            }
+            for name, category, start, duration, peak, thread in self.events
+        ]
+        with open(self.output, "w") as fp:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fp)
+
+    def summary(self):
+        """Number of calls, total time and highest peak memory of each span name, slowest first"""
+        totals = defaultdict(lambda: [0, 0, 0])
+        for name, category, _, duration, peak, _ in self.events:
+            total = totals[f"{category}: {name}"]
+            total[0] += 1
+            total[1] += duration
+            total[2] = max(total[2], peak)
+
+        lines = [f"{'Span':50} {'calls':>6} {'total ms':>10} {'max peak KiB':>14}"]
+        for key, (calls, duration, peak) in sorted(
+            totals.items(), key=lambda item: item[1][1], reverse=True
+        ):
+            lines.append(
+                f"{key[:50]:50} {calls:6} {duration / 1e6:10.1f} {peak / 1024:14.1f}"
+            )
+        return "\n".join(lines)
+
+
+profiler = Profiler()
+
+
+def enable_from_env():
+    """Enables profiling if the CASTLE_CHESS_PROFILE environment variable is set"""
+    output = os.environ.get(PROFILE_ENV)
+    if output:
+        profiler.enable(output)
+
+
+def profiled(category):
+    """Decorator recording a span for each call of the function (named after the function)"""
+
+    def decorator(function):
+        name = function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            with profiler._span(name, category):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
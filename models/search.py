@@ -0,0 +1,273 @@
+"""
+Player search: an in-memory inverted index for prefix and typo-tolerant matching.
+
+Each entry has a key and a few texts (name, email, Chess ID), split into words. The distinct words
+are kept sorted for prefix search, and indexed by trigrams for fuzzy search: a misspelled word is
+matched against the words sharing enough trigrams with it, by edit distance. A query matches the
+entries where each of its words is found (exactly, as a prefix, or with a few typos).
+"""
+
+import heapq
+import re
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Hashable, Iterable, List, Set
+
+WORD_RE = re.compile(r"\w+")
+
+# Cost of a query word matching a word of an entry as a prefix; a typo costs 1
+PREFIX_COST = 0.5
+# Prefix search stops gathering entries past this number (for very short prefixes)
+PREFIX_CAP = 2000
+# Words compared by edit distance to a query word, among those sharing the most trigrams with it
+FUZZY_WORDS = 200
+# Trigrams found in more words than this are skipped by fuzzy search (when there are other ones)
+COMMON_TRIGRAM = 20000
+
+
+def normalize(text):
+    return " ".join(WORD_RE.findall(text.lower()))
+
+
+def trigrams(word):
+    """Trigrams of a word, padded so that the start of the word weighs more"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit=None):
+    """
+    Edit distance between two strings, counting a swap of two adjacent characters as one edit
+    (optimal string alignment). Stops at limit + 1 when a limit is given.
+    """
+    # The common prefix and suffix do not change the distance
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        distance = len(a)
+        return distance if limit is None else min(distance, limit + 1)
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+
+    before = None
+    previous = list(range(len(b) + 1))
+    previous_lowest = 0
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        lowest = i
+        for j, char_b in enumerate(b, 1):
+            cost = previous[j - 1] + (char_a != char_b)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            if (
+                before is not None
+                and j > 1
+                and char_a == b[j - 2]
+                and a[i - 2] == char_b
+                and before[j - 2] + 1 < cost
+            ):
+                cost = before[j - 2] + 1
+            current.append(cost)
+            if cost < lowest:
+                lowest = cost
+        # A swap reads the row before the previous one: both rows must be over the limit
+        if limit is not None and lowest > limit and previous_lowest > limit:
+            return limit + 1
+        before, previous = previous, current
+        previous_lowest = lowest
+    distance = previous[-1]
+    return distance if limit is None else min(distance, limit + 1)
+
+
+def allowed_typos(word):
+    """Number of typos tolerated in a query word: one per three characters"""
+    return len(word) // 3
+
+
+class SearchIndex:
+    """
+    Inverted index of entries (any hashable key) by the words of their texts.
+
+    Words get a number the first time they are seen; the trigram postings are arrays of word
+    numbers. A word that no entry has anymore stays in the vocabulary, and is skipped. The number
+    of a removed entry is given to the next entry added, so replacing entries does not grow the
+    index.
+    """
+
+    def __init__(self):
+        self.numbers: Dict[Hashable, int] = {}
+        self.keys: List[Hashable] = []
+        # Numbers of the removed entries, reused by add
+        self.free: List[int] = []
+        self.texts: Dict[int, tuple] = {}
+        # Word -> entries having it (only the words of live entries)
+        self.word_entries: Dict[str, Set[int]] = {}
+        self.vocabulary: List[str] = []
+        self.word_numbers: Dict[str, int] = {}
+        self.postings: Dict[str, array] = {}
+        self.sorted_words: List[str] = []
+        # New words, added to sorted_words by the next prefix search
+        self.pending_words: List[str] = []
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __contains__(self, key):
+        return key in self.numbers
+
+    def add(self, key, texts: Iterable[str]):
+        """Adds an entry (or replaces the entry with this key)"""
+        if key in self.numbers:
+            self.remove(key)
+
+        if self.free:
+            number = self.free.pop()
+            self.keys[number] = key
+        else:
+            number = len(self.keys)
+            self.keys.append(key)
+        self.numbers[key] = number
+        texts = tuple(normalize(text) for text in texts if text)
+        self.texts[number] = texts
+
+        for text in texts:
+            for word in text.split():
+                entries = self.word_entries.get(word)
+                if entries is None:
+                    entries = self.word_entries[word] = set()
+                    if word not in self.word_numbers:
+                        self._add_word(word)
+                entries.add(number)
+
+    def _add_word(self, word):
+        word_number = len(self.vocabulary)
+        self.vocabulary.append(word)
+        self.word_numbers[word] = word_number
+        self.pending_words.append(word)
+        for gram in trigrams(word):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("l")
+            posting.append(word_number)
+
+    def remove(self, key):
+        number = self.numbers.pop(key, None)
+        if number is None:
+            return
+
+        for text in self.texts.pop(number):
+            for word in text.split():
+                entries = self.word_entries.get(word)
+                if entries is None:
+                    continue
+                entries.discard(number)
+                if not entries:
+                    del self.word_entries[word]
+        self.keys[number] = None
+        self.free.append(number)
+
+    def sort_words(self):
+        """Adds the new words to the sorted words (done by prefix search when needed)"""
+        if self.pending_words:
+            if len(self.pending_words) < 64:
+                for word in self.pending_words:
+                    insort(self.sorted_words, word)
+            else:
+                self.sorted_words.extend(self.pending_words)
+                self.sorted_words.sort()
+            self.pending_words = []
+
+    def prefix_words(self, prefix):
+        """Yields the words (of live entries) starting with prefix, in order"""
+        self.sort_words()
+        words = self.sorted_words
+        i = bisect_left(words, prefix)
+        while i < len(words) and words[i].startswith(prefix):
+            if words[i] in self.word_entries:
+                yield words[i]
+            i += 1
+
+    def similar_words(self, word, allowed):
+        """Yields (word, distance) for the words (of live entries) within allowed typos of word"""
+        grams = trigrams(word)
+        postings = sorted(
+            (self.postings[gram] for gram in grams if gram in self.postings), key=len
+        )
+        rare = [p for p in postings if len(p) <= COMMON_TRIGRAM] or postings[:1]
+
+        shared = Counter()
+        for posting in rare:
+            shared.update(posting)
+
+        # A typo changes at most 4 trigrams (a swap): the words sharing fewer are too far from word
+        needed = len(grams) - 4 * allowed - (len(postings) - len(rare))
+        for word_number, count in shared.most_common(FUZZY_WORDS):
+            if count < needed:
+                break
+            candidate = self.vocabulary[word_number]
+            if candidate == word or candidate not in self.word_entries:
+                continue
+            distance = edit_distance(word, candidate, allowed)
+            if distance <= allowed:
+                yield candidate, distance
+
+    def word_matches(self, word) -> Dict[int, float]:
+        """Entries matching a query word, with the cost of the match"""
+        found = set(self.word_entries.get(word, ()))
+        matches = dict.fromkeys(found, 0)
+
+        # Cheapest matches first: an entry keeps the cost of the first word it is found by
+        def merge(entry_word, cost):
+            new = self.word_entries[entry_word] - found
+            if new:
+                found.update(new)
+                matches.update(dict.fromkeys(new, cost))
+
+        for entry_word in self.prefix_words(word):
+            if len(matches) >= PREFIX_CAP:
+                break
+            if entry_word != word:
+                merge(entry_word, PREFIX_COST)
+
+        allowed = allowed_typos(word)
+        if allowed:
+            similar = sorted(self.similar_words(word, allowed), key=itemgetter(1))
+            for entry_word, distance in similar:
+                merge(entry_word, distance)
+        return matches
+
+    def search(self, query, limit=10) -> List[Hashable]:
+        """
+        Keys of the entries where each word of the query is found, best first: exact words, then
+        prefixes, then words with typos (ties are broken by entry number).
+        """
+        words = normalize(query).split()
+        if not words:
+            return []
+
+        scores = None
+        # The longest words usually match the fewest entries
+        for word in sorted(set(words), key=len, reverse=True):
+            matches = self.word_matches(word)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {n: c + matches[n] for n, c in scores.items() if n in matches}
+            if not scores:
+                return []
+
+        best = heapq.nsmallest(limit, scores.items(), key=itemgetter(1, 0))
+        return [self.keys[number] for number, _ in best]
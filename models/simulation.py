@@ -0,0 +1,217 @@
+"""
+Monte Carlo forecast of the remaining rounds of a tournament.
+
+Each simulation plays the unfinished matches of the current round, then the rounds left, and
+ranks the players by points. All the simulations of a batch are played at once with NumPy
+arrays (simulations x players): a round sorts the players of every simulation by points, pairs
+them in order (#1 with #2, #3 with #4...), gives the bye to the last one when the number of
+players is odd, and draws the results from the Elo probabilities of the pairs.
+
+This simplified Swiss pairing does not avoid rematches or second byes: it is meant for
+forecasts, not for the real pairings (see SwissPairingEngine).
+
+NumPy is only needed to run simulations: it is imported when a simulator is created.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .pairing import player_chess_id, player_points
+
+# Rating of the players missing from the ratings given to the simulator
+DEFAULT_RATING = 1500
+# Probability of a draw between players of the same rating (it decreases with the rating gap)
+DRAW_RATE = 0.3
+# Number of simulations x players held in memory at once
+BATCH_ELEMENTS = 500_000
+
+
+def import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("Simulations need NumPy (pip install numpy)") from None
+    return numpy
+
+
+def outcome_probabilities(np, ratings1, ratings2, draw_rate=DRAW_RATE):
+    """
+    Probabilities of a win and of a draw for the first players of the pairs, from the Elo
+    expected score: a win plus half a draw is worth the expected score.
+    """
+    expected = 1.0 / (1.0 + np.power(10.0, (ratings2 - ratings1) / 400.0))
+    draw = draw_rate * (1.0 - np.abs(2.0 * expected - 1.0))
+    return expected - draw / 2.0, draw
+
+
+@dataclass
+class SimulationResult:
+    """Finishing positions of the players over the simulations"""
+
+    chess_ids: List[str]
+    # positions[i, k]: number of simulations where player i finished at position k + 1
+    positions: object
+    # Points of each player at the end, summed over the simulations
+    total_points: object
+    simulations: int
+
+    def __post_init__(self):
+        self.rows = {chess_id: row for row, chess_id in enumerate(self.chess_ids)}
+
+    def distribution(self, chess_id):
+        """Probability of each finishing position (first to last) for a player"""
+        return self.positions[self.rows[chess_id]] / self.simulations
+
+    def probability_top(self, chess_id, places=1):
+        """Probability for a player to finish in the first places"""
+        return self.positions[self.rows[chess_id], :places].sum() / self.simulations
+
+    def expected_position(self, chess_id):
+        counts = self.positions[self.rows[chess_id]]
+        return float((counts * range(1, len(counts) + 1)).sum() / self.simulations)
+
+    def expected_points(self, chess_id):
+        return float(self.total_points[self.rows[chess_id]] / self.simulations)
+
+    def favourites(self, places=1, count=10):
+        """Chess IDs of the players most likely to finish in the first places, with the probability"""
+        probabilities = self.positions[:, :places].sum(axis=1) / self.simulations
+        # Ties are broken by the expected position
+        weighted = self.positions * range(1, len(self.chess_ids) + 1)
+        positions = weighted.sum(axis=1)
+        best = sorted(
+            range(len(self.chess_ids)),
+            key=lambda row: (-probabilities[row], positions[row]),
+        )
+        return [
+            (self.chess_ids[row], float(probabilities[row])) for row in best[:count]
+        ]
+
+
+class TournamentSimulator:
+    """
+    Replays the rest of a tournament many times (see the module docstring).
+
+    ratings gives the Elo rating of the players by Chess ID; the final ranking of a simulation
+    is by points, ties keeping the registration order.
+    """
+
+    def __init__(
+        self,
+        tournament,
+        ratings: Optional[Dict[str, float]] = None,
+        draw_rate=DRAW_RATE,
+        seed=None,
+    ):
+        self.np = np = import_numpy()
+        self.tournament = tournament
+        self.draw_rate = draw_rate
+        self.rng = np.random.default_rng(seed)
+
+        players = list(tournament.registered_players)
+        self.chess_ids = [player_chess_id(p) for p in players]
+        rows = {chess_id: row for row, chess_id in enumerate(self.chess_ids)}
+        ratings = ratings or {}
+        self.ratings = np.array(
+            [ratings.get(chess_id, DEFAULT_RATING) for chess_id in self.chess_ids],
+            dtype=np.float32,
+        )
+        self.points = np.array([player_points(p) for p in players], dtype=float)
+
+        # Unfinished matches of the current round, already paired
+        self.pending = []
+        self.pending_byes = []
+        current = tournament.current_round or 1
+        rounds = tournament.rounds or []
+        paired = 0 < current <= len(rounds) and bool(rounds[current - 1])
+        if paired and not tournament.finished:
+            for match in rounds[current - 1]:
+                if match.get("completed"):
+                    continue
+                match_rows = [rows[c] for c in match["players"] if c in rows]
+                if len(match_rows) == 2:
+                    self.pending.append(match_rows)
+                elif len(match_rows) == 1:
+                    self.pending_byes.append(match_rows[0])
+
+        if tournament.finished:
+            self.rounds_left = 0
+        else:
+            self.rounds_left = max(
+                0, tournament.num_rounds - max(current, 1) + (0 if paired else 1)
+            )
+
+    def run(self, simulations=10000) -> SimulationResult:
+        np = self.np
+        count = len(self.chess_ids)
+        positions = np.zeros((count, count), dtype=np.int64)
+        total_points = np.zeros(count)
+
+        batch_size = max(1, BATCH_ELEMENTS // max(count, 1))
+        done = 0
+        while done < simulations:
+            size = min(batch_size, simulations - done)
+            halves = self.play(size)
+            total_points += halves.sum(axis=0) / 2.0
+
+            # Position of each player in each simulation, counted per (player, position)
+            order = self.rank(halves)
+            places = np.tile(np.arange(count), size)
+            positions += np.bincount(
+                order.ravel() * count + places, minlength=count * count
+            ).reshape(count, count)
+            done += size
+
+        return SimulationResult(self.chess_ids, positions, total_points, simulations)
+
+    def play(self, size):
+        """
+        Points of the players at the end of size simulations (simulations x players), counted
+        in half points so that they are integers
+        """
+        np = self.np
+        count = len(self.chess_ids)
+        halves = np.tile(np.rint(self.points * 2).astype(np.int32), (size, 1))
+        # Offset of each simulation in the flattened array
+        offsets = np.arange(size, dtype=np.int64)[:, None] * count
+
+        if self.pending:
+            pairs = np.array(self.pending)
+            self.play_matches(
+                halves,
+                offsets,
+                np.broadcast_to(pairs[:, 0], (size, len(pairs))),
+                np.broadcast_to(pairs[:, 1], (size, len(pairs))),
+            )
+        if self.pending_byes:
+            halves[:, self.pending_byes] += 2
+
+        for _ in range(self.rounds_left):
+            order = self.rank(halves)
+            if count % 2:
+                halves.ravel()[offsets[:, 0] + order[:, -1]] += 2
+                order = order[:, :-1]
+            self.play_matches(halves, offsets, order[:, 0::2], order[:, 1::2])
+        return halves
+
+    def play_matches(self, halves, offsets, players1, players2):
+        """Draws the results of the pairs of each simulation, and adds the half points won"""
+        np = self.np
+        win, draw = outcome_probabilities(
+            np, self.ratings[players1], self.ratings[players2], self.draw_rate
+        )
+        draws = self.rng.random(players1.shape, dtype=np.float32)
+        # 2 for a win, 1 for a draw, 0 for a loss
+        scores = (draws < win).astype(np.int32) + (draws < win + draw)
+        # A player plays once per round: the indexes of a simulation are distinct
+        flat = halves.ravel()
+        flat[offsets + players1] += scores
+        flat[offsets + players2] += 2 - scores
+
+    def rank(self, halves):
+        """Players of each simulation by points (ties keep the registration order)"""
+        np = self.np
+        count = halves.shape[1]
+        # The keys are distinct integers: they are sorted without a stable sort
+        keys = -halves * count + np.arange(count, dtype=np.int32)
+        return np.argsort(keys, axis=1)
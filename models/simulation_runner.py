@@ -0,0 +1,179 @@
+"""
+Monte Carlo runs of whole tournaments, with the real Swiss pairing and play_round.
+
+The tournaments are split into chunks of a fixed size, each played with its own random
+generator seeded from the run seed and the chunk number: a run gives the same statistics
+whatever the number of worker processes. The statistics of the chunks are merged at the end.
+
+Run from the project root: python -m models.simulation_runner --players 64 --rounds 7
+"""
+
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from .tournament import PlayerDetails
+from .tournament_operation import TournamentOperations
+
+# Number of tournaments played with the same random generator
+CHUNK_SIZE = 50
+
+
+@dataclass
+class SimulationStats:
+    """Statistics of a set of simulated tournaments"""
+
+    tournaments: int = 0
+    matches: int = 0
+    # Matches between players who had already played each other
+    rematches: int = 0
+    # Number of byes a player got in a tournament -> number of players
+    byes: Counter = field(default_factory=Counter)
+    # Final points -> number of players
+    scores: Counter = field(default_factory=Counter)
+    # Sum over the tournaments of the gap between the best and the worst final points
+    spread_total: float = 0.0
+    pairing_seconds: float = 0.0
+
+    def merge(self, other):
+        self.tournaments += other.tournaments
+        self.matches += other.matches
+        self.rematches += other.rematches
+        self.byes.update(other.byes)
+        self.scores.update(other.scores)
+        self.spread_total += other.spread_total
+        self.pairing_seconds += other.pairing_seconds
+        return self
+
+    @property
+    def repeat_rate(self):
+        """Share of the matches that were rematches"""
+        return self.rematches / self.matches if self.matches else 0.0
+
+    @property
+    def mean_spread(self):
+        return self.spread_total / self.tournaments if self.tournaments else 0.0
+
+    def score_deviation(self):
+        """Standard deviation of the final points of the players"""
+        count = sum(self.scores.values())
+        if not count:
+            return 0.0
+        mean = sum(points * n for points, n in self.scores.items()) / count
+        variance = (
+            sum((points - mean) ** 2 * n for points, n in self.scores.items()) / count
+        )
+        return variance**0.5
+
+    def report(self):
+        lines = [
+            f"Tournaments: {self.tournaments}",
+            f"Matches: {self.matches}, rematches: {self.rematches}"
+            f" ({self.repeat_rate:.2%})",
+            "Byes per player: "
+            + ", ".join(f"{n}: {self.byes[n]}" for n in sorted(self.byes)),
+            f"Score spread (best - worst): {self.mean_spread:.2f} on average,"
+            f" standard deviation of the scores: {self.score_deviation():.2f}",
+            f"Pairing time: {self.pairing_seconds:.2f} s",
+        ]
+        return "\n".join(lines)
+
+
+def play_tournament(player_count, rounds, rng) -> SimulationStats:
+    """Plays a tournament (random results) and returns its statistics"""
+    players = [
+        PlayerDetails(name="", email="", chess_id=f"SR{i:05d}", birthday="")
+        for i in range(player_count)
+    ]
+    # Round 1 pairs the players in a random order
+    rng.shuffle(players)
+
+    stats = SimulationStats(tournaments=1)
+    previous_pairings = set()
+    byes = Counter()
+    for _ in range(rounds):
+        played = set(previous_pairings)
+        start = time.perf_counter()
+        pairings = TournamentOperations.generate_swiss_pairings(
+            players, previous_pairings, set(byes)
+        )
+        stats.pairing_seconds += time.perf_counter() - start
+
+        for player1, player2 in pairings:
+            if player2 is None:
+                byes[player1.chess_id] += 1
+                continue
+            stats.matches += 1
+            pair = (player1.chess_id, player2.chess_id)
+            if pair in played or pair[::-1] in played:
+                stats.rematches += 1
+        TournamentOperations.play_round(pairings, rng)
+
+    if player_count > len(byes):
+        stats.byes[0] = player_count - len(byes)
+    stats.byes.update(byes.values())
+    points = [player.points for player in players]
+    stats.scores.update(points)
+    stats.spread_total = max(points) - min(points)
+    return stats
+
+
+def play_chunk(player_count, rounds, count, seed) -> SimulationStats:
+    """Plays count tournaments with a generator seeded by seed"""
+    rng = random.Random(seed)
+    stats = SimulationStats()
+    for _ in range(count):
+        stats.merge(play_tournament(player_count, rounds, rng))
+    return stats
+
+
+def run_simulations(
+    player_count, rounds, tournaments, workers=None, seed=0, chunk_size=CHUNK_SIZE
+) -> SimulationStats:
+    """Plays tournaments over a pool of worker processes, and merges their statistics"""
+    chunks = [
+        (player_count, rounds, min(chunk_size, tournaments - start), f"{seed}-{number}")
+        for number, start in enumerate(range(0, tournaments, chunk_size))
+    ]
+
+    stats = SimulationStats()
+    if workers == 1:
+        for chunk in chunks:
+            stats.merge(play_chunk(*chunk))
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_stats in executor.map(play_chunk, *zip(*chunks)):
+            stats.merge(chunk_stats)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Plays random tournaments with the Swiss pairing, in parallel"
+    )
+    parser.add_argument("--players", type=int, default=64, help="Number of players")
+    parser.add_argument("--rounds", type=int, default=7, help="Number of rounds")
+    parser.add_argument(
+        "--tournaments", type=int, default=1000, help="Number of tournaments"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="Worker processes"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = run_simulations(
+        args.players, args.rounds, args.tournaments, args.workers, args.seed
+    )
+    print(stats.report())
+    print(f"Done in {time.perf_counter() - start:.2f} s with {args.workers} worker(s)")
+
+
+if __name__ == "__main__":
+    main()
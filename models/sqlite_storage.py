@@ -0,0 +1,656 @@
+"""
+SQLite storage backend.
+
+Clubs, players, tournaments, their players, rounds and matches are rows of indexed tables, so that
+clubs and tournaments can be listed, paged and filtered without loading all the players and
+rounds. Tournament changes recorded through Tournament.log update the rows they touch.
+Birthdays are stored as day ordinals in both player tables; a tournament player birthday that
+is not a valid date is kept as written in raw_birthday (its ordinal is 0), like PlayerTable does.
+
+Run this module to copy the JSON data folder into a database:
+
+    python -m models.sqlite_storage castle.db --data data
+"""
+
+import argparse
+import sqlite3
+import threading
+from pathlib import Path
+
+from .club import ChessClub
+from .dates import format_ordinal, parse_ordinal
+from .loader import json_files
+from .player import Player
+from .player_directory import CLUB, TOURNAMENT, DirectorySource, PlayerDirectory
+from .player_table import PlayerTable
+from .search import SearchIndex
+from .storage import DATA_FOLDER, JSONStorage, Storage
+from .tournament import LARGE_ROSTER, PlayerDetails, Tournament
+from .tournament_repository import TournamentSummary
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clubs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS players (
+    club_id INTEGER NOT NULL REFERENCES clubs (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    chess_id TEXT NOT NULL,
+    birthday INTEGER NOT NULL,
+    PRIMARY KEY (club_id, position)
+);
+CREATE INDEX IF NOT EXISTS players_chess_id ON players (chess_id);
+CREATE INDEX IF NOT EXISTS players_name ON players (name COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS tournaments (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    venue TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    start_ordinal INTEGER NOT NULL,
+    number_of_rounds INTEGER,
+    current_round INTEGER,
+    completed INTEGER NOT NULL,
+    finished INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tournaments_name ON tournaments (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS tournaments_start ON tournaments (start_ordinal);
+
+CREATE TABLE IF NOT EXISTS tournament_players (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    chess_id TEXT NOT NULL,
+    birthday INTEGER NOT NULL,
+    raw_birthday TEXT,
+    points REAL NOT NULL,
+    PRIMARY KEY (tournament_id, position)
+);
+CREATE INDEX IF NOT EXISTS tournament_players_chess_id
+    ON tournament_players (chess_id, tournament_id);
+
+CREATE TABLE IF NOT EXISTS rounds (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments (id) ON DELETE CASCADE,
+    number INTEGER NOT NULL,
+    PRIMARY KEY (tournament_id, number)
+);
+CREATE TABLE IF NOT EXISTS matches (
+    tournament_id INTEGER NOT NULL REFERENCES tournaments (id) ON DELETE CASCADE,
+    round INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    player1 TEXT NOT NULL,
+    player2 TEXT,
+    completed INTEGER NOT NULL,
+    winner TEXT,
+    PRIMARY KEY (tournament_id, round, position)
+);
+CREATE INDEX IF NOT EXISTS matches_player1 ON matches (player1);
+CREATE INDEX IF NOT EXISTS matches_player2 ON matches (player2);
+"""
+
+# Same statuses as TournamentSummary.from_data
+STATUS_SQL = (
+    "CASE WHEN finished THEN 'finished' WHEN completed THEN 'completed' "
+    "ELSE 'in progress' END"
+)
+
+
+def like_pattern(search):
+    """LIKE pattern matching the strings that contain search"""
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def match_row(match):
+    """(player1, player2, completed, winner) columns of a round entry; player2 is None for a bye"""
+    players = match["players"]
+    return (
+        players[0],
+        players[1] if len(players) > 1 else None,
+        bool(match.get("completed")),
+        match.get("winner"),
+    )
+
+
+def birthday_columns(birthday):
+    """(birthday, raw_birthday) columns of a tournament player birthday"""
+    try:
+        return parse_ordinal(birthday), None
+    except (TypeError, ValueError):
+        return 0, birthday or None
+
+
+def birthday_value(row):
+    """Birthday of a tournament_players row, as it was written"""
+    if row["raw_birthday"] is not None:
+        return row["raw_birthday"]
+    return format_ordinal(row["birthday"]) if row["birthday"] else ""
+
+
+def tournament_key(tournament):
+    """Key of a tournament: the name of its file in the JSON layout"""
+    if tournament.filepath:
+        return Path(tournament.filepath).name
+    return f"{tournament.name.replace(' ', '_')}.json"
+
+
+class SQLitePlayerDirectory(PlayerDirectory):
+    """
+    The player directory of a database: its sources are the clubs and tournaments of the
+    database, read again by refresh() when the database changed (see SQLiteStorage.version).
+    """
+
+    def __init__(self, storage):
+        # No folders and no directory file: the sources are read from the database
+        self.storage = storage
+        self.search_index = SearchIndex()
+        self.sources = {}
+        self.version = None
+
+    def refresh(self):
+        version = self.storage.version()
+        if version == self.version:
+            return
+        self.version = version
+
+        sources = self.storage.directory_sources()
+        for filepath in set(self.sources) - {source.filepath for source in sources}:
+            self.remove_source(filepath)
+        for source in sources:
+            # Only the clubs and tournaments that changed are indexed again
+            if self.sources.get(source.filepath) != source:
+                self.add_source(source)
+        self.search_index.sort_words()
+
+
+class SQLiteStorage(Storage):
+    """
+    Clubs and tournaments kept in an SQLite database.
+
+    The storage is also the repository of the tournaments (see Storage). A tournament is opened
+    once: opening it again returns the same instance.
+    """
+
+    def __init__(self, database):
+        super().__init__()
+        self.database = database
+        # Used by the write-behind timers of the clubs too
+        self.connection = sqlite3.connect(database, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        self.opened = {}
+        # Number of clubs and tournaments written through this storage
+        self.changes = 0
+        self.directory = None
+
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA foreign_keys = ON")
+            self.connection.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    # Clubs
+
+    def load_clubs(self):
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id, name FROM clubs ORDER BY name"
+            ).fetchall()
+
+        clubs = []
+        for row in rows:
+            club = ChessClub(name=row["name"], storage=self)
+            club.storage_key = row["id"]
+            clubs.append(club)
+        return clubs
+
+    def create_club(self, name):
+        club = ChessClub(name=name, storage=self)
+        club.players = []
+        club.save()
+        return club
+
+    def version(self):
+        """Changes when clubs or tournaments are written (by this process, or another one)"""
+        with self.lock:
+            data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+            return self.changes, data_version
+
+    def player_directory(self):
+        if self.directory is None:
+            self.directory = SQLitePlayerDirectory(self)
+        return self.directory
+
+    def directory_sources(self):
+        """A DirectorySource for each club and tournament of the database"""
+        with self.lock:
+            db = self.connection
+            clubs = db.execute("SELECT id, name FROM clubs ORDER BY id").fetchall()
+            club_players = db.execute(
+                "SELECT club_id, chess_id, name, email FROM players "
+                "ORDER BY club_id, position"
+            ).fetchall()
+            tournaments = db.execute(
+                "SELECT id, key, name FROM tournaments ORDER BY key"
+            ).fetchall()
+            tournament_players = db.execute(
+                "SELECT tournament_id, chess_id, name, email FROM tournament_players "
+                "ORDER BY tournament_id, position"
+            ).fetchall()
+
+        players = {}
+        for rows, kind in ((club_players, CLUB), (tournament_players, TOURNAMENT)):
+            for owner, chess_id, name, email in rows:
+                players.setdefault((kind, owner), []).append([chess_id, name, email])
+
+        sources = []
+        for kind, rows in ((CLUB, clubs), (TOURNAMENT, tournaments)):
+            for row in rows:
+                # Same keys as Tournament.register for the tournaments
+                key = row["key"] if kind == TOURNAMENT else f"club:{row['id']}"
+                sources.append(
+                    DirectorySource(
+                        kind=kind,
+                        name=row["name"],
+                        filepath=f"{self.database}:{key}",
+                        mtime=0.0,
+                        players=players.get((kind, row["id"]), []),
+                    )
+                )
+        return sources
+
+    def club_key(self, name):
+        """Key of the (first) club with this name, None if there is none"""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT min(id) FROM clubs WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0]
+
+    def save_club(self, club):
+        rows = [
+            (position, p.name, p.email, p.chess_id, p.birthdate.toordinal())
+            for position, p in enumerate(club.players)
+        ]
+
+        with self.lock, self.connection as db:
+            if club.storage_key is None:
+                cursor = db.execute("INSERT INTO clubs (name) VALUES (?)", (club.name,))
+                club.storage_key = cursor.lastrowid
+            else:
+                db.execute(
+                    "UPDATE clubs SET name = ? WHERE id = ?",
+                    (club.name, club.storage_key),
+                )
+                db.execute("DELETE FROM players WHERE club_id = ?", (club.storage_key,))
+            db.executemany(
+                "INSERT INTO players (club_id, position, name, email, chess_id, "
+                "birthday) VALUES (?, ?, ?, ?, ?, ?)",
+                [(club.storage_key,) + row for row in rows],
+            )
+            self.changes += 1
+
+    def _player_filter(self, club, search):
+        sql = "FROM players WHERE club_id = ?"
+        params = [club.storage_key]
+        if search:
+            sql += (
+                " AND (name LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\'"
+                " OR chess_id LIKE ? ESCAPE '\\')"
+            )
+            params += [like_pattern(search)] * 3
+        return sql, params
+
+    def load_players(self, club, search=None, offset=0, limit=None):
+        """
+        Players of a club, in order. search keeps the players whose name, email or Chess ID
+        contains it (ignoring case); offset and limit select a page of the result.
+        """
+        if club.storage_key is None:
+            return []
+
+        sql, params = self._player_filter(club, search)
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT name, email, chess_id, birthday {sql} "
+                "ORDER BY position LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset],
+            ).fetchall()
+
+        return [
+            Player(
+                name=row["name"],
+                email=row["email"],
+                chess_id=row["chess_id"],
+                birthday=format_ordinal(row["birthday"]),
+            )
+            for row in rows
+        ]
+
+    def count_players(self, club, search=None):
+        """Number of players load_players returns without offset and limit"""
+        if club.storage_key is None:
+            return 0
+
+        sql, params = self._player_filter(club, search)
+        with self.lock:
+            row = self.connection.execute(f"SELECT count(*) {sql}", params).fetchone()
+        return row[0]
+
+    # Tournaments
+
+    def tournament_repository(self, folder=None):
+        return self
+
+    def _tournament_filter(self, search, status):
+        # One tournament per name, like the JSON repository
+        sql = (
+            "FROM tournaments "
+            "WHERE key IN (SELECT min(key) FROM tournaments GROUP BY name)"
+        )
+        params = []
+        if search:
+            sql += " AND (name LIKE ? ESCAPE '\\' OR venue LIKE ? ESCAPE '\\')"
+            params += [like_pattern(search)] * 2
+        if status is not None:
+            sql += f" AND {STATUS_SQL} = ?"
+            params.append(status)
+        return sql, params
+
+    def list(self, search=None, status=None, offset=0, limit=None, newest_first=False):
+        """Same as TournamentRepository.list"""
+        sql, params = self._tournament_filter(search, status)
+        order = "start_ordinal DESC, key" if newest_first else "key"
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT key, name, venue, start_date, end_date, start_ordinal, "
+                f"{STATUS_SQL} AS status {sql} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset],
+            ).fetchall()
+
+        return [
+            TournamentSummary(
+                name=row["name"],
+                venue=row["venue"],
+                start_date=row["start_date"],
+                end_date=row["end_date"],
+                status=row["status"],
+                filename=row["key"],
+                mtime=0.0,
+                start_ordinal=row["start_ordinal"],
+            )
+            for row in rows
+        ]
+
+    def count(self, search=None, status=None):
+        sql, params = self._tournament_filter(search, status)
+        with self.lock:
+            row = self.connection.execute(f"SELECT count(*) {sql}", params).fetchone()
+        return row[0]
+
+    def open(self, summary):
+        """Loads the full tournament (players and rounds) for a list() entry"""
+        key = summary.filename
+        tournament = self.opened.get(key)
+        if tournament is not None:
+            return tournament
+
+        with self.lock:
+            db = self.connection
+            row = db.execute(
+                "SELECT * FROM tournaments WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Unknown tournament {key}")
+            players = db.execute(
+                "SELECT name, email, chess_id, birthday, raw_birthday, points "
+                "FROM tournament_players WHERE tournament_id = ? ORDER BY position",
+                (row["id"],),
+            ).fetchall()
+            numbers = db.execute(
+                "SELECT max(number) FROM rounds WHERE tournament_id = ?", (row["id"],)
+            ).fetchone()[0]
+            matches = db.execute(
+                "SELECT round, player1, player2, completed, winner FROM matches "
+                "WHERE tournament_id = ? ORDER BY round, position",
+                (row["id"],),
+            ).fetchall()
+
+        players = [
+            {
+                "name": p["name"],
+                "email": p["email"],
+                "chess_id": p["chess_id"],
+                "birthday": birthday_value(p),
+                "points": p["points"],
+            }
+            for p in players
+        ]
+        if len(players) >= LARGE_ROSTER:
+            registered_players = PlayerTable.from_entries(players)
+        else:
+            registered_players = [PlayerDetails(**p) for p in players]
+
+        rounds = [[] for _ in range(numbers or 0)]
+        for match in matches:
+            match_players = [match["player1"]]
+            if match["player2"] is not None:
+                match_players.append(match["player2"])
+            rounds[match["round"] - 1].append(
+                {
+                    "players": match_players,
+                    "completed": bool(match["completed"]),
+                    "winner": match["winner"],
+                }
+            )
+
+        tournament = Tournament(
+            name=row["name"],
+            venue=row["venue"],
+            start_date=row["start_date"],
+            end_date=row["end_date"],
+            registered_players=registered_players,
+            current_round=row["current_round"],
+            completed=bool(row["completed"]),
+            finished=bool(row["finished"]),
+            rounds=rounds,
+        )
+        # Set afterwards: the MAX_ROUNDS check of the constructor is meant for new tournaments
+        tournament.num_rounds = row["number_of_rounds"]
+        tournament._storage = self
+        tournament._storage_key = key
+        tournament.mark_clean()
+
+        self.opened[key] = tournament
+        Tournament.register(tournament, f"{self.database}:{key}")
+        return tournament
+
+    def write_tournament(self, tournament, key):
+        """Writes the whole tournament under key (replacing the tournament with this key)"""
+        players = [
+            (
+                position,
+                p.name,
+                p.email,
+                p.chess_id,
+                *birthday_columns(p.birthday),
+                p.points,
+            )
+            for position, p in enumerate(tournament.registered_players)
+        ]
+        matches = [
+            (number, position) + match_row(match)
+            for number, round_matches in enumerate(tournament.rounds or [], 1)
+            for position, match in enumerate(round_matches)
+        ]
+
+        with self.lock, self.connection as db:
+            db.execute(
+                "INSERT INTO tournaments (key, name, venue, start_date, end_date, "
+                "start_ordinal, number_of_rounds, current_round, completed, finished) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET name = excluded.name, "
+                "venue = excluded.venue, start_date = excluded.start_date, "
+                "end_date = excluded.end_date, start_ordinal = excluded.start_ordinal, "
+                "number_of_rounds = excluded.number_of_rounds, "
+                "current_round = excluded.current_round, "
+                "completed = excluded.completed, finished = excluded.finished",
+                (
+                    key,
+                    tournament.name,
+                    tournament.venue,
+                    tournament.start_date,
+                    tournament.end_date,
+                    tournament.start_ordinal,
+                    tournament.num_rounds,
+                    tournament.current_round,
+                    bool(tournament.completed),
+                    bool(tournament.finished),
+                ),
+            )
+            tournament_id = db.execute(
+                "SELECT id FROM tournaments WHERE key = ?", (key,)
+            ).fetchone()[0]
+
+            for table in ("tournament_players", "rounds", "matches"):
+                db.execute(
+                    f"DELETE FROM {table} WHERE tournament_id = ?", (tournament_id,)
+                )
+            db.executemany(
+                "INSERT INTO tournament_players (tournament_id, position, name, email, "
+                "chess_id, birthday, raw_birthday, points) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(tournament_id,) + p for p in players],
+            )
+            db.executemany(
+                "INSERT INTO rounds (tournament_id, number) VALUES (?, ?)",
+                [
+                    (tournament_id, number)
+                    for number in range(1, len(tournament.rounds or []) + 1)
+                ],
+            )
+            db.executemany(
+                "INSERT INTO matches (tournament_id, round, position, player1, "
+                "player2, completed, winner) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(tournament_id,) + m for m in matches],
+            )
+            self.changes += 1
+
+    def save_tournament(self, tournament):
+        if tournament._storage_key is None:
+            tournament._storage = self
+            tournament._storage_key = tournament_key(tournament)
+            self.opened[tournament._storage_key] = tournament
+            key = tournament._storage_key
+            Tournament.register(tournament, f"{self.database}:{key}")
+        self.write_tournament(tournament, tournament._storage_key)
+
+    def log(self, tournament, record):
+        """Applies a Tournament.log record to the rows of the tournament"""
+        if tournament._storage_key is None:
+            self.save_tournament(tournament)
+            return
+
+        with self.lock, self.connection as db:
+            tournament_id = db.execute(
+                "SELECT id FROM tournaments WHERE key = ?", (tournament._storage_key,)
+            ).fetchone()[0]
+
+            op = record.get("op")
+            if op == "pairings":
+                number = record["round"]
+                db.executemany(
+                    "INSERT OR IGNORE INTO rounds (tournament_id, number) "
+                    "VALUES (?, ?)",
+                    [(tournament_id, n) for n in range(1, number + 1)],
+                )
+                db.execute(
+                    "DELETE FROM matches WHERE tournament_id = ? AND round = ?",
+                    (tournament_id, number),
+                )
+                db.executemany(
+                    "INSERT INTO matches (tournament_id, round, position, player1, "
+                    "player2, completed, winner) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (tournament_id, number, position) + match_row(match)
+                        for position, match in enumerate(record["matches"])
+                    ],
+                )
+            elif op == "result":
+                db.execute(
+                    "UPDATE matches SET completed = 1, winner = ? "
+                    "WHERE tournament_id = ? AND round = ? AND position = ?",
+                    (record["winner"], tournament_id, record["round"], record["match"]),
+                )
+                # The first player registered with a Chess ID, like Tournament.get_player
+                db.executemany(
+                    "UPDATE tournament_players SET points = points + ? "
+                    "WHERE tournament_id = ? AND position = (SELECT min(position) "
+                    "FROM tournament_players WHERE tournament_id = ? AND chess_id = ?)",
+                    [
+                        (delta, tournament_id, tournament_id, chess_id)
+                        for chess_id, delta in record["points"].items()
+                    ],
+                )
+            elif op == "round":
+                db.execute(
+                    "UPDATE tournaments SET current_round = ? WHERE id = ?",
+                    (record["current_round"], tournament_id),
+                )
+
+
+def migrate(data_folder, database):
+    """Copies the clubs and tournaments of a JSON data folder into an SQLite database"""
+    data_folder = Path(data_folder)
+    source = JSONStorage(data_folder / "clubs", data_folder / "tournaments")
+    storage = SQLiteStorage(database)
+
+    clubs = source.load_clubs()
+    for club in clubs:
+        copy = ChessClub(name=club.name, storage=storage)
+        # Migrating again replaces the clubs copied before
+        copy.storage_key = storage.club_key(club.name)
+        copy.players = club.players
+        copy.save()
+
+    tournaments = []
+    errors = []
+    # Every file is copied, even the ones with the name of another tournament
+    for filepath in json_files(source.tournaments_folder):
+        try:
+            tournament = Tournament.from_json(filepath)
+            if tournament is not None:
+                storage.write_tournament(tournament, filepath.name)
+                tournaments.append(tournament)
+        except (OSError, ValueError, KeyError, TypeError, sqlite3.Error) as e:
+            # A bad file is skipped: the others are still copied
+            errors.append((filepath, e))
+
+    for filepath, e in source.errors:
+        print(f"Could not load club file {Path(filepath).name}: {e}")
+    for filepath, e in errors:
+        print(f"Could not copy tournament file {filepath.name}: {e}")
+    print(f"{len(clubs)} clubs and {len(tournaments)} tournaments copied to {database}")
+    storage.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Copies the JSON data folder into an SQLite database"
+    )
+    parser.add_argument("database", help="SQLite database file (created if needed)")
+    parser.add_argument("--data", default=DATA_FOLDER, help="JSON data folder")
+    args = parser.parse_args()
+    migrate(args.data, args.database)
+
+
+if __name__ == "__main__":
+    main()
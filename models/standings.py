@@ -0,0 +1,160 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Set
+
+from models.pairing import add_points, player_chess_id, player_points
+
+# Score of a player for a match: win, draw, loss (a bye counts as a win)
+WIN, DRAW, LOSS = 1.0, 0.5, 0.0
+
+
+class Standings:
+    """
+    Tournament standings, updated as match results are recorded.
+
+    Players are kept in buckets by number of points, with the sorted list of distinct scores on the side:
+    recording a result moves two players between buckets, and the rank of a player is the number of
+    players in the higher buckets plus its position in its own bucket. Only the buckets that are read
+    are ordered, using the tiebreaks (Buchholz, then Sonneborn-Berger, then registration order).
+    """
+
+    def __init__(self, players, rounds=None):
+        # What the standings were built from, so the owner can tell when they are outdated
+        self.source = players
+        self.rounds = rounds
+        self.players = {}
+        self.order = {}
+        self.games: Dict[str, List[tuple]] = {}
+        self.buckets: Dict[float, Set[str]] = {}
+        self.scores: List[float] = []
+
+        for position, player in enumerate(players):
+            chess_id = player_chess_id(player)
+            self.players[chess_id] = player
+            self.order[chess_id] = position
+            self.games[chess_id] = []
+            self._insert(chess_id, player_points(player))
+
+        # The points are read from the players: past rounds only provide the opponents
+        for round_matches in rounds or []:
+            for match in round_matches:
+                if match.get("completed"):
+                    self._add_games(match)
+
+    def _insert(self, chess_id, points):
+        bucket = self.buckets.get(points)
+        if bucket is None:
+            bucket = self.buckets[points] = set()
+            insort(self.scores, points)
+        bucket.add(chess_id)
+
+    def _remove(self, chess_id, points):
+        bucket = self.buckets[points]
+        bucket.discard(chess_id)
+        if not bucket:
+            del self.buckets[points]
+            del self.scores[bisect_left(self.scores, points)]
+
+    def _add_games(self, match):
+        """Stores the opponents and scores of a completed match, returns the score of each player"""
+        match_players = match["players"]
+        winner = match.get("winner")
+
+        if len(match_players) == 1:
+            results = {match_players[0]: (None, WIN)}
+        else:
+            player1_id, player2_id = match_players
+            if winner is None:
+                score1 = score2 = DRAW
+            elif winner == player1_id:
+                score1, score2 = WIN, LOSS
+            else:
+                score1, score2 = LOSS, WIN
+            results = {
+                player1_id: (player2_id, score1),
+                player2_id: (player1_id, score2),
+            }
+
+        for chess_id, game in results.items():
+            if chess_id in self.games:
+                self.games[chess_id].append(game)
+        return {chess_id: score for chess_id, (_, score) in results.items()}
+
+    def _add_points(self, chess_id, delta):
+        player = self.players.get(chess_id)
+        if player is None or not delta:
+            return
+
+        points = player_points(player)
+        self._remove(chess_id, points)
+        add_points(player, delta)
+        self._insert(chess_id, points + delta)
+
+    def record_result(self, match):
+        """
+        Records a completed match (round entry with 'players' and 'winner') and updates the points.
+        Returns the points won by each player.
+        """
+        scores = self._add_games(match)
+        for chess_id, score in scores.items():
+            self._add_points(chess_id, score)
+        return scores
+
+    def buchholz(self, chess_id):
+        """Sum of the points of the opponents"""
+        return sum(
+            player_points(self.players[opponent])
+            for opponent, _ in self.games[chess_id]
+            if opponent in self.players
+        )
+
+    def sonneborn_berger(self, chess_id):
+        """Sum of the points of the opponents beaten, plus half the points of the opponents drawn"""
+        return sum(
+            score * player_points(self.players[opponent])
+            for opponent, score in self.games[chess_id]
+            if opponent in self.players
+        )
+
+    def _sorted_bucket(self, points):
+        return sorted(
+            self.buckets[points],
+            key=lambda chess_id: (
+                -self.buchholz(chess_id),
+                -self.sonneborn_berger(chess_id),
+                self.order[chess_id],
+            ),
+        )
+
+    def top(self, k=None) -> List:
+        """Returns the k best players (all players if k is None), best first"""
+        ranking = []
+        for points in reversed(self.scores):
+            if k is not None and len(ranking) >= k:
+                break
+            ranking.extend(self.players[c] for c in self._sorted_bucket(points))
+        return ranking if k is None else ranking[:k]
+
+    def rank(self, chess_id) -> Optional[int]:
+        """Returns the rank (starting at 1) of a player"""
+        player = self.players.get(chess_id)
+        if player is None:
+            return None
+
+        points = player_points(player)
+        above = sum(
+            len(self.buckets[p])
+            for p in self.scores[bisect_left(self.scores, points) + 1:]
+        )
+        return above + self._sorted_bucket(points).index(chess_id) + 1
+
+    def rows(self, k=None):
+        """Yields (rank, player, points, Buchholz, Sonneborn-Berger) for the k best players"""
+        for rank, player in enumerate(self.top(k), 1):
+            chess_id = player_chess_id(player)
+            yield (
+                rank,
+                player,
+                player_points(player),
+                self.buchholz(chess_id),
+                self.sonneborn_berger(chess_id),
+            )
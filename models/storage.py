@@ -0,0 +1,113 @@
+import os
+from abc import ABCMeta, abstractmethod
+from pathlib import Path
+from typing import List, Optional
+
+from .club import ChessClub
+from .club_cache import club_cache
+from .loader import json_files
+from .player_directory import PlayerDirectory
+from .tournament_repository import TournamentRepository
+
+# Path of an SQLite database to use instead of the JSON files
+DATABASE_ENV = "CASTLE_CHESS_DB"
+
+DATA_FOLDER = Path(__file__).resolve().parent.parent / "data"
+
+
+class Storage(metaclass=ABCMeta):
+    """
+    Where the clubs and tournaments are kept.
+
+    The tournaments are reached through a repository: list(search, status, offset, limit) returns
+    TournamentSummary entries (a page of them, filtered), count() their number, and open(summary)
+    the full Tournament. The players of all the clubs and tournaments are searched through
+    player_directory().
+    """
+
+    def __init__(self):
+        # Files or rows that could not be loaded, as (location, exception)
+        self.errors = []
+
+    @abstractmethod
+    def load_clubs(self) -> List[ChessClub]:
+        """Returns all the clubs"""
+
+    @abstractmethod
+    def create_club(self, name) -> ChessClub:
+        """Creates (and saves) a new club"""
+
+    @abstractmethod
+    def save_club(self, club):
+        """Saves a club and its players"""
+
+    @abstractmethod
+    def tournament_repository(self, folder=None):
+        """Returns the repository of the tournaments"""
+
+    @abstractmethod
+    def player_directory(self) -> PlayerDirectory:
+        """Returns the directory of the players of the clubs and tournaments"""
+
+
+class JSONStorage(Storage):
+    """
+    The JSON layout of the data folder: one file per club, one file per tournament.
+    The clubs are kept in a cache (the one of the process by default): only the files changed
+    on disk since they were loaded are read again.
+    """
+
+    def __init__(
+        self, clubs_folder=None, tournaments_folder=None, loader=None, cache=club_cache
+    ):
+        super().__init__()
+        self.clubs_folder = Path(clubs_folder or DATA_FOLDER / "clubs")
+        self.tournaments_folder = Path(
+            tournaments_folder or DATA_FOLDER / "tournaments"
+        )
+        self.loader = loader
+        self.cache = cache
+
+    def load_clubs(self):
+        # Only the names are read (concurrently): the players of a club are streamed from its file
+        # when they are first needed. The files that could not be read are kept in errors
+        result = self.cache.load(json_files(self.clubs_folder), self.loader)
+        self.errors = result.errors
+        return result.items
+
+    def create_club(self, name):
+        filepath = self.clubs_folder / (name.replace(" ", "") + ".json")
+        club = ChessClub(name=name, filepath=filepath)
+        club.save()
+        self.cache.add(club)
+        return club
+
+    def save_club(self, club):
+        club.save()
+
+    def tournament_repository(self, folder=None):
+        return TournamentRepository.get(folder or self.tournaments_folder)
+
+    def player_directory(self):
+        return PlayerDirectory.get(self.tournaments_folder.parent)
+
+
+_storage: Optional[Storage] = None
+
+
+def get_storage() -> Storage:
+    """
+    Returns the storage of the application: the SQLite database named by the CASTLE_CHESS_DB
+    environment variable if it is set, the JSON files of the data folder otherwise.
+    """
+    global _storage
+    if _storage is None:
+        database = os.environ.get(DATABASE_ENV)
+        if database:
+            # Imported here: the JSON backend does not need sqlite3
+            from .sqlite_storage import SQLiteStorage
+
+            _storage = SQLiteStorage(database)
+        else:
+            _storage = JSONStorage()
+    return _storage
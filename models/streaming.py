@@ -0,0 +1,197 @@
+"""
+Streaming reader for the JSON data files.
+
+JSONStream goes through the top-level object of a file and decodes one value at a time: the large
+arrays (the players of a club or a tournament, the rounds) are read one entry at a time, so the
+whole file is never held in memory. BackgroundReader consumes such a stream in a thread, so that
+the first entries can be used while the rest is still being read.
+"""
+
+import json
+import threading
+
+CHUNK_SIZE = 1 << 16
+
+WHITESPACE = " \t\n\r"
+# Characters that may follow a value
+DELIMITERS = WHITESPACE + ",]}"
+
+_decoder = json.JSONDecoder()
+
+
+class JSONStream:
+    """Event-based reader of a JSON object, from a text file object"""
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+
+    def _read(self, size=None):
+        """Reads the next chunk; returns False at the end of the file"""
+        chunk = self.fp.read(size or self.chunk_size)
+        if not chunk:
+            return False
+        # What was already decoded is dropped
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        """Next character that is not whitespace (None at the end of the file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read():
+                return None
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char is None or char not in chars:
+            raise json.JSONDecodeError(
+                f"Expecting one of {chars!r}", self.buffer, self.pos
+            )
+        self.pos += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # The value may go on in the next chunk. The chunks read grow with the value, so a
+                # large value (like a round of a big tournament) is not decoded again too often
+                if self._read(max(self.chunk_size, len(self.buffer) - self.pos)):
+                    continue
+                raise
+            if (
+                end == len(self.buffer)
+                or isinstance(value, (int, float))
+                and self.buffer[end] not in DELIMITERS
+            ) and self._read():
+                # So may a number ("-1." is read as -1 when the chunk ends after the dot)
+                continue
+            self.pos = end
+            return value
+
+    def events(self, streamed=()):
+        """
+        Goes through the top-level object: yields ("field", key, value) for each member, except the
+        arrays of the keys in streamed, for which ("item", key, entry) is yielded for each entry.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting a key", self.buffer, self.pos)
+            self._expect(":")
+
+            if key in streamed and self._peek() == "[":
+                self.pos += 1
+                if self._peek() == "]":
+                    self.pos += 1
+                else:
+                    while True:
+                        yield "item", key, self._value()
+                        if self._expect(",]") == "]":
+                            break
+            else:
+                yield "field", key, self._value()
+
+            if self._expect(",}") == "}":
+                return
+
+
+def stream_events(filepath, streamed=()):
+    """Events (see JSONStream.events) of a JSON file"""
+    with open(filepath) as fp:
+        yield from JSONStream(fp).events(streamed)
+
+
+def data_events(data, streamed=()):
+    """Same events as JSONStream.events, for an object that was already decoded"""
+    for key, value in data.items():
+        if key in streamed and isinstance(value, list):
+            for entry in value:
+                yield "item", key, entry
+        else:
+            yield "field", key, value
+
+
+def read_fields(filepath, streamed=()):
+    """Members of the top-level object of a file, without the arrays of the keys in streamed"""
+    return {
+        key: value
+        for kind, key, value in stream_events(filepath, streamed)
+        if kind == "field"
+    }
+
+
+class BackgroundReader:
+    """
+    Consumes an iterable in a background thread.
+
+    Iterating over the reader yields the entries as they come; result() waits for all of them.
+    An exception raised by the iterable is raised again by both.
+    """
+
+    # The waiting threads are woken up after this many entries
+    NOTIFY_EVERY = 256
+
+    def __init__(self, iterable):
+        self.items = []
+        self.done = False
+        self.error = None
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._consume, args=(iterable,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _consume(self, iterable):
+        try:
+            for item in iterable:
+                self.items.append(item)
+                if len(self.items) % self.NOTIFY_EVERY == 0:
+                    with self.condition:
+                        self.condition.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            with self.condition:
+                self.done = True
+                self.condition.notify_all()
+
+    def __iter__(self):
+        position = 0
+        while True:
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: self.done or len(self.items) > position
+                )
+                available = len(self.items)
+                done = self.done
+
+            while position < available:
+                yield self.items[position]
+                position += 1
+
+            if done and position == len(self.items):
+                if self.error is not None:
+                    raise self.error
+                return
+
+    def result(self):
+        """Waits for the iterable to be consumed, and returns its entries"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.done)
+        if self.error is not None:
+            raise self.error
+        return self.items
@@ -0,0 +1,261 @@
+"""
+Seeded generator of synthetic clubs and tournaments, for load tests and benchmarks.
+
+Players are drawn in batches (names from fixed pools, birthdays as day ordinals) with one
+random.Random per file, seeded from the seed given and the file number: the same seed always
+gives the same files. Chess IDs are unique: the i-th player of a generator gets the i-th
+element of a seeded permutation of all the possible IDs. Clubs are streamed to disk batch by
+batch, so a club of millions of players is never held in memory; tournaments are played with
+the Swiss pairing and random results for the rounds already played.
+
+Run from the project root:
+    python -m models.synthetic /tmp/data --clubs 2 --club-size 1000000
+    python -m models.synthetic /tmp/data --tournaments 1000 --players 64 --rounds 7
+"""
+
+import argparse
+import json
+import math
+import random
+from datetime import date
+from pathlib import Path
+
+from .dates import format_ordinal
+from .files import open_atomic
+from .tournament import PlayerDetails
+from .tournament_operation import TournamentOperations
+
+FIRST_NAMES = (
+    "James Mary John Patricia Robert Jennifer Michael Linda William Elizabeth David "
+    "Barbara Richard Susan Joseph Jessica Thomas Sarah Charles Karen Christopher Lisa "
+    "Daniel Nancy Matthew Betty Anthony Margaret Mark Sandra Donald Ashley Steven "
+    "Kimberly Paul Emily Andrew Donna Joshua Michelle Kenneth Carol Kevin Amanda "
+    "Brian Dorothy George Melissa Timothy Deborah Ronald Stephanie Edward Rebecca "
+    "Jason Sharon Jeffrey Laura Ryan Cynthia Jacob Kathleen Gary Amy Nicholas Angela "
+    "Eric Shirley Jonathan Anna Stephen Brenda Larry Pamela Justin Emma Scott Nicole "
+    "Brandon Helen Benjamin Samantha Samuel Katherine Gregory Christine Alexander "
+    "Debra Frank Rachel Patrick Carolyn Raymond Janet Jack Catherine"
+).split()
+LAST_NAMES = (
+    "Smith Johnson Williams Brown Jones Garcia Miller Davis Rodriguez Martinez "
+    "Hernandez Lopez Gonzalez Wilson Anderson Thomas Taylor Moore Jackson Martin Lee "
+    "Perez Thompson White Harris Sanchez Clark Ramirez Lewis Robinson Walker Young "
+    "Allen King Wright Scott Torres Nguyen Hill Flores Green Adams Nelson Baker Hall "
+    "Rivera Campbell Mitchell Carter Roberts Gomez Phillips Evans Turner Diaz Parker "
+    "Cruz Edwards Collins Reyes Stewart Morris Morales Murphy Cook Rogers Gutierrez "
+    "Ortiz Morgan Cooper Peterson Bailey Reed Kelly Howard Ramos Kim Cox Ward "
+    "Richardson Watson Brooks Chavez Wood James Bennett Gray Mendoza Ruiz Hughes "
+    "Price Alvarez Castillo Sanders Patel Myers Long Ross Foster Jimenez"
+).split()
+DOMAINS = ("example.com", "example.org", "example.net")
+TOWNS = (
+    "Springfield Cornville Newport Riverside Fairview Kingston Greenville Salem "
+    "Madison Georgetown Clinton Franklin Arlington Ashland Dover Hudson Milton Oxford "
+    "Burlington"
+).split()
+
+# Two letters and five digits
+CHESS_ID_SPACE = 26 * 26 * 100000
+BATCH_SIZE = 10000
+BIRTHDAYS = (date(1940, 1, 1).toordinal(), date(2008, 12, 31).toordinal())
+TOURNAMENT_DATES = (date(2015, 1, 1).toordinal(), date(2025, 12, 31).toordinal())
+LETTER_PAIRS = [chr(65 + i // 26) + chr(65 + i % 26) for i in range(26 * 26)]
+
+
+def format_chess_id(number):
+    return f"{LETTER_PAIRS[number // 100000]}{number % 100000:05d}"
+
+
+class PlayerGenerator:
+    """
+    Generates players with unique Chess IDs.
+
+    The IDs come from an affine permutation of the ID space (number * step + offset, modulo its
+    size, with a step prime to the size): they look random, and none is given twice.
+    """
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.offset = self.rng.randrange(CHESS_ID_SPACE)
+        self.step = self.rng.randrange(1, CHESS_ID_SPACE)
+        while math.gcd(self.step, CHESS_ID_SPACE) != 1:
+            self.step += 1
+        self.count = 0
+
+    def chess_ids(self, count):
+        if self.count + count > CHESS_ID_SPACE:
+            raise ValueError("No Chess ID left for so many players")
+        start = self.count
+        self.count += count
+        step, offset = self.step, self.offset
+        return [
+            format_chess_id((number * step + offset) % CHESS_ID_SPACE)
+            for number in range(start, start + count)
+        ]
+
+    def batches(self, count, batch_size=BATCH_SIZE):
+        """Yields lists of player dicts (name, email, chess_id, birthday), count players in all"""
+        choices = self.rng.choices
+        birthdays = [
+            format_ordinal(day) for day in range(BIRTHDAYS[0], BIRTHDAYS[1] + 1)
+        ]
+        while count > 0:
+            size = min(batch_size, count)
+            count -= size
+            first_names = choices(FIRST_NAMES, k=size)
+            last_names = choices(LAST_NAMES, k=size)
+            domains = choices(DOMAINS, k=size)
+            yield [
+                {
+                    "name": f"{first} {last}",
+                    "email": f"{first}.{last}.{chess_id}@{domain}".lower(),
+                    "chess_id": chess_id,
+                    "birthday": birthday,
+                }
+                for first, last, domain, chess_id, birthday in zip(
+                    first_names,
+                    last_names,
+                    domains,
+                    self.chess_ids(size),
+                    choices(birthdays, k=size),
+                )
+            ]
+
+    def players(self, count):
+        return [player for batch in self.batches(count) for player in batch]
+
+
+def write_club(filepath, name, count, seed=0):
+    """Writes a club file of count players, one batch at a time"""
+    with open_atomic(filepath) as fp:
+        fp.write(f'{{"name": {json.dumps(name)}, "players": [')
+        separator = ""
+        for batch in PlayerGenerator(seed).batches(count):
+            fp.write(separator)
+            # The players of the batch, without the brackets of the list
+            fp.write(json.dumps(batch)[1:-1])
+            separator = ", "
+        fp.write("]}")
+
+
+def tournament_data(members, played_rounds, num_rounds, rng, name="", venue=""):
+    """
+    Data of a tournament file for the members, with played_rounds rounds paired (Swiss pairing)
+    and played (random results)
+    """
+    players = [PlayerDetails(**member) for member in members]
+    previous_pairings = set()
+    byes = set()
+    rounds = []
+    for _ in range(played_rounds):
+        pairings = TournamentOperations.generate_swiss_pairings(
+            players, previous_pairings, byes
+        )
+        matches = []
+        for player1, player2, result in TournamentOperations.play_round(pairings, rng):
+            if player2 is None:
+                byes.add(player1.chess_id)
+                matches.append({"players": [player1.chess_id], "completed": True})
+                continue
+            winner = {"win": player1.chess_id, "loss": player2.chess_id}.get(result)
+            matches.append(
+                {
+                    "players": [player1.chess_id, player2.chess_id],
+                    "completed": True,
+                    "winner": winner,
+                }
+            )
+        rounds.append(matches)
+
+    start = rng.randrange(*TOURNAMENT_DATES)
+    finished = played_rounds >= num_rounds
+    return {
+        "name": name or f"Tournament of {len(players)} players",
+        "venue": venue or f"{rng.choice(TOWNS)} Chess Hall",
+        "dates": {
+            "from": format_ordinal(start),
+            "to": format_ordinal(start + num_rounds),
+        },
+        "players": [player.make_dict() for player in players],
+        "number_of_rounds": num_rounds,
+        "current_round": min(played_rounds + 1, num_rounds),
+        "completed": finished,
+        "finished": finished,
+        "rounds": rounds + [[] for _ in range(num_rounds - played_rounds)],
+    }
+
+
+def generate(
+    folder,
+    clubs=0,
+    club_size=1000,
+    tournaments=0,
+    players=32,
+    rounds=4,
+    played_rounds=None,
+    seed=0,
+):
+    """
+    Writes clubs and tournaments in the clubs and tournaments folders of a data folder.
+    Tournaments have rounds rounds, of which played_rounds are played (by default, a random
+    number of them: some tournaments are finished, others are in progress).
+    """
+    folder = Path(folder)
+    (folder / "clubs").mkdir(parents=True, exist_ok=True)
+    (folder / "tournaments").mkdir(parents=True, exist_ok=True)
+
+    for number in range(clubs):
+        town = TOWNS[number % len(TOWNS)]
+        write_club(
+            folder / "clubs" / f"synthetic{number}.json",
+            f"{town} Chess Club {number}",
+            club_size,
+            seed=f"{seed}-club-{number}",
+        )
+
+    for number in range(tournaments):
+        rng = random.Random(f"{seed}-tournament-{number}")
+        members = PlayerGenerator(f"{seed}-players-{number}").players(players)
+        played = rng.randint(0, rounds) if played_rounds is None else played_rounds
+        data = tournament_data(
+            members, played, rounds, rng, name=f"Synthetic Tournament {number}"
+        )
+        with open_atomic(folder / "tournaments" / f"synthetic{number}.json") as fp:
+            json.dump(data, fp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generates synthetic data files")
+    parser.add_argument("folder", help="Data folder (clubs and tournaments folders)")
+    parser.add_argument("--clubs", type=int, default=0, help="Number of clubs")
+    parser.add_argument("--club-size", type=int, default=1000, help="Players per club")
+    parser.add_argument(
+        "--tournaments", type=int, default=0, help="Number of tournaments"
+    )
+    parser.add_argument(
+        "--players", type=int, default=32, help="Players per tournament"
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=4, help="Rounds per tournament"
+    )
+    parser.add_argument(
+        "--played-rounds",
+        type=int,
+        help="Rounds already played (random by default)",
+    )
+    parser.add_argument("--seed", default="0", help="Random seed")
+    args = parser.parse_args()
+    generate(
+        args.folder,
+        args.clubs,
+        args.club_size,
+        args.tournaments,
+        args.players,
+        args.rounds,
+        args.played_rounds,
+        args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,33 @@
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import InitVar, dataclass, field
 import os
-from datetime import datetime
-from typing import List, Optional, ClassVar
+from typing import Dict, List, Optional, ClassVar
 import json
 from pathlib import Path
 
+from .autosave import autosaver
+from .dates import format_ordinal, parse_ordinal, sort_ordinal
+from .files import file_lock, file_stat, open_atomic
+from .journal import TournamentJournal
+from .loader import Loader, json_files, read_json
+from .player_table import PlayerTable
+from .profiling import profiled
+from .search import SearchIndex
+from .standings import Standings
+from .streaming import data_events, stream_events
 
 MAX_ROUNDS = 4
+# Rosters of this size (and more) are loaded in a PlayerTable rather than a list of PlayerDetails
+LARGE_ROSTER = 5000
+# The tournament file is rewritten (and its journal cleared) when the journal reaches this size
+JOURNAL_COMPACT_THRESHOLD = 500
+# Arrays of a tournament file read one entry at a time
+STREAMED_FIELDS = ("players", "rounds")
+# Set (to any value) when several processes enter results in the same tournaments
+SHARED_ENV = "CASTLE_CHESS_SHARED"
 
 
-@dataclass
+@dataclass(slots=True)
 class PlayerDetails:
     name: str
     email: str
@@ -27,7 +45,19 @@ class PlayerDetails:
         }
 
 
-DATE_FORMAT = "%d-%m-%Y"
+def player_details(entry):
+    """PlayerDetails of a player entry of a tournament file: a player dict, or a Chess ID string"""
+    if isinstance(entry, str):
+        # Player is represented by chess_id only
+        return PlayerDetails(name="", email="", chess_id=entry, birthday="")
+    # Player has detailed information
+    return PlayerDetails(
+        name=entry.get("name", ""),
+        email=entry.get("email", ""),
+        chess_id=entry.get("chess_id", ""),
+        birthday=entry.get("birthday", ""),
+        points=entry.get("points", 0),
+    )
 
 
 @dataclass
@@ -43,16 +73,75 @@ class Tournament:
     finished: Optional[bool] = False
     rounds: Optional[List[List[dict]]] = None
     filepath: Optional[Path] = None
+    # Content of the file, when it was already read (otherwise it is read from filepath)
+    data: InitVar[Optional[dict]] = None
+    _standings: Optional[Standings] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _player_index: Optional[Dict[str, PlayerDetails]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _indexed_players: Optional[tuple] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _search_index: Optional[SearchIndex] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _searched_players: Optional[tuple] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _journal: Optional[TournamentJournal] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Dirty tracking: the version is bumped by every change of a field, and saved with the tournament
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    _saved_version: int = field(default=0, init=False, repr=False, compare=False)
+    # Modification time of the file when it was last read or written
+    _mtime: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    # Shared mode: version number and stat of the file when it was last read or written, and
+    # depth of the locked() blocks
+    _file_version: int = field(default=0, init=False, repr=False, compare=False)
+    _file_stat: Optional[tuple] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _lock_depth: int = field(default=0, init=False, repr=False, compare=False)
+    # Storage backend keeping the tournament instead of a file (see models.storage), and its key there
+    _storage: Optional[object] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _storage_key: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     tournaments: ClassVar[List["Tournament"]] = []
+    # Identity map: loaded tournaments by file path, so that each file is held once in memory
+    loaded: ClassVar[Dict[str, "Tournament"]] = {}
+    # Several processes (arbiters) update the same tournament files: see locked()
+    shared: ClassVar[bool] = bool(os.environ.get(SHARED_ENV))
+
+    def __setattr__(self, key, value):
+        super().__setattr__(key, value)
+        if not key.startswith("_"):
+            super().__setattr__("_version", self.__dict__.get("_version", 0) + 1)
+
+    @property
+    def dirty(self):
+        """True when the tournament was changed since it was loaded or saved"""
+        return self._version != self._saved_version
+
+    def mark_clean(self):
+        self._saved_version = self._version
 
-    def __post_init__(self):
+    def __post_init__(self, data=None):
         if self.filepath:
             if os.path.isdir(self.filepath):
                 self.load_from_folder()
             else:
-                self.load_from_json()
+                self.load_from_json(data)
         else:
+            # Not saved anywhere yet
+            self._saved_version = -1
+
             """required_fields = [self.name, self.venue, self.start_date, self.end_date, self.num_rounds,
              self.current_round]
             if not all(required_fields):
@@ -60,6 +149,262 @@ class Tournament:
             if self.num_rounds > MAX_ROUNDS:
                 raise ValueError(f"Number of rounds cannot exceed {MAX_ROUNDS}")
 
+    @property
+    def standings(self) -> Standings:
+        """Standings of the tournament, rebuilt only when the players or rounds are replaced"""
+        standings = self._standings
+        if (
+            standings is None
+            or standings.source is not self.registered_players
+            or standings.rounds is not self.rounds
+        ):
+            standings = Standings(self.registered_players, self.rounds)
+            self._standings = standings
+        return standings
+
+    @property
+    def start_ordinal(self) -> int:
+        """Start date as a day ordinal, to sort tournaments (0 if there is no valid date)"""
+        return sort_ordinal(self.start_date)
+
+    @property
+    def player_index(self) -> Dict[str, PlayerDetails]:
+        """Registered players by Chess ID, rebuilt when the list of players is replaced or resized"""
+        indexed = (self.registered_players, len(self.registered_players))
+        if (
+            self._player_index is None
+            or self._indexed_players[0] is not indexed[0]
+            or self._indexed_players[1] != indexed[1]
+        ):
+            self._indexed_players = indexed
+            # Reversed, so the first player registered with a Chess ID wins
+            self._player_index = {
+                p.chess_id: p for p in reversed(self.registered_players)
+            }
+        return self._player_index
+
+    def get_player(self, chess_id) -> Optional[PlayerDetails]:
+        """Returns the registered player with this Chess ID (None if there is none)"""
+        if isinstance(self.registered_players, PlayerTable):
+            # The table has its own index
+            return self.registered_players.get(chess_id)
+        return self.player_index.get(chess_id)
+
+    def search_players(self, query, limit=20) -> List[PlayerDetails]:
+        """
+        Registered players matching the query (name, email or Chess ID, prefixes and typos
+        allowed). The index is rebuilt when the list of players is replaced or resized.
+        """
+        searched = (self.registered_players, len(self.registered_players))
+        if (
+            self._search_index is None
+            or self._searched_players[0] is not searched[0]
+            or self._searched_players[1] != searched[1]
+        ):
+            self._searched_players = searched
+            self._search_index = SearchIndex()
+            for player in reversed(self.registered_players):
+                self._search_index.add(
+                    player.chess_id, (player.name, player.email, player.chess_id)
+                )
+        chess_ids = self._search_index.search(query, limit)
+        return [self.get_player(chess_id) for chess_id in chess_ids]
+
+    @property
+    def journal(self) -> Optional[TournamentJournal]:
+        """Journal of the changes not written to the tournament file yet (next to the file)"""
+        if not self.filepath:
+            return None
+        journal_path = Path(self.filepath).with_suffix(".journal")
+        if self._journal is None or self._journal.filepath != journal_path:
+            self._journal = TournamentJournal(journal_path)
+        return self._journal
+
+    def log(self, record):
+        """Appends a change to the journal, and compacts it when it grows too big"""
+        if self._storage is not None:
+            # The storage applies the change to what it holds
+            self._storage.log(self, record)
+            return
+
+        journal = self.journal
+        if journal is None:
+            print("Filepath not set. Cannot save tournament.")
+            return
+
+        with self._file_lock() as taken:
+            if taken and self.catch_up():
+                # Read again: the change of the record was made to the state read before
+                self.apply_records([record])
+            # Version of the file the change applies to (see apply_records)
+            record["version"] = self._file_version
+            journal.append(record)
+        if journal.count >= JOURNAL_COMPACT_THRESHOLD and not autosaver.is_pending(
+            str(self.filepath)
+        ):
+            self.save_later()
+
+    def set_pairings(self, round_number, matches):
+        """Sets (and records) the matches of a round"""
+        while len(self.rounds) < round_number:
+            self.rounds.append([])
+        self.rounds[round_number - 1] = matches
+        self.log({"op": "pairings", "round": round_number, "matches": matches})
+
+    def record_result(self, round_number, match_index):
+        """Records the result of a completed match: updates the standings and logs the points won"""
+        match = self.rounds[round_number - 1][match_index]
+        points = self.standings.record_result(match)
+        self.log(
+            {
+                "op": "result",
+                "round": round_number,
+                "match": match_index,
+                "winner": match.get("winner"),
+                "points": points,
+            }
+        )
+
+    def enter_result(self, round_number, match_index, winner, players=None):
+        """
+        Records the result of a match: winner is the Chess ID of the winner, None for a draw.
+        In shared mode, another arbiter may have entered the result first, or paired the round
+        again: the match is then left as it is, and False is returned (players are the Chess
+        IDs of the match the result is for).
+        """
+        with self.locked():
+            match = self.rounds[round_number - 1][match_index]
+            if players is not None and match["players"] != list(players):
+                return False
+            if match.get("completed"):
+                return match.get("winner") == winner
+            match["completed"] = True
+            match["winner"] = winner
+            self.record_result(round_number, match_index)
+            return True
+
+    def advance_round(self, from_round=None):
+        """
+        Moves to the next round. With from_round, only if the tournament is still at that round
+        (in shared mode, another arbiter may have moved it already): returns False otherwise.
+        """
+        with self.locked():
+            if from_round is not None and self.current_round != from_round:
+                return False
+            was_dirty = self.dirty
+            self.current_round += 1
+            self.log({"op": "round", "current_round": self.current_round})
+            if not was_dirty:
+                # Already saved by the journal
+                self.mark_clean()
+            return True
+
+    def finish(self):
+        # Written in full, so the listing index sees the new status
+        with self.locked():
+            self.finished = True
+            self.save_later()
+
+    @contextmanager
+    def _file_lock(self):
+        """Holds the lock of the file in shared mode, once (nested blocks do nothing): yields True if taken"""
+        if (
+            not self.shared
+            or self._lock_depth
+            or not self.filepath
+            or self._storage is not None
+        ):
+            yield False
+            return
+
+        with file_lock(Path(self.filepath).with_suffix(".lock")):
+            self._lock_depth += 1
+            try:
+                yield True
+            finally:
+                self._lock_depth -= 1
+
+    @contextmanager
+    def locked(self):
+        """
+        In shared mode, holds the lock of the tournament file (see files.file_lock) during the
+        block, after applying the changes saved by the other processes: what is read in the block
+        is up to date, and what is recorded in it is saved after their changes.
+        Does nothing when the tournament is not shared.
+        """
+        with self._file_lock() as taken:
+            if taken:
+                self.catch_up()
+            yield self
+
+    def refresh(self):
+        """Applies the changes saved by the other processes (shared mode)"""
+        with self.locked():
+            pass
+
+    def catch_up(self):
+        """
+        Applies the changes saved by other processes since the file was last read or written:
+        the records appended to the journal, or the whole file if it was written again (then
+        returns True).
+        """
+        if file_stat(self.filepath) != self._file_stat:
+            self.load_from_json()
+            return True
+
+        records = self.journal.read_new()
+        if records:
+            was_dirty = self.dirty
+            self.apply_records(records)
+            if not was_dirty:
+                # Already saved by the other processes
+                self.mark_clean()
+        return False
+
+    def replay_journal(self):
+        """Applies the journal records on top of the data loaded from the tournament file"""
+        journal = self.journal
+        if journal is None:
+            return
+
+        self.apply_records(journal.read())
+
+    def apply_records(self, records):
+        """
+        Applies journal records to the tournament. Records made before the version of the file
+        was written are already in it, and skipped: the file can be written and the journal not
+        cleared yet (interrupted save). So is a result already there (records of older journals).
+        """
+        for record in records:
+            if record.get("version", self._file_version) < self._file_version:
+                continue
+            op = record.get("op")
+            if op == "pairings":
+                while len(self.rounds) < record["round"]:
+                    self.rounds.append([])
+                self.rounds[record["round"] - 1] = record["matches"]
+            elif op == "result":
+                try:
+                    match = self.rounds[record["round"] - 1][record["match"]]
+                except IndexError:
+                    print(
+                        f"Ignoring result for an unknown match in {self.journal.filepath}"
+                    )
+                    continue
+                if match.get("completed") and match.get("winner") == record["winner"]:
+                    continue
+                match["completed"] = True
+                match["winner"] = record["winner"]
+                for chess_id, delta in record["points"].items():
+                    player = self.get_player(chess_id)
+                    if player:
+                        player.points += delta
+            elif op == "round":
+                self.current_round = record["current_round"]
+
+        # Points changed behind the standings' back
+        self._standings = None
+
     @classmethod
     def load_from_folder(cls):
         base_dir = Path(__file__).resolve().parent.parent
@@ -67,55 +412,75 @@ class Tournament:
         for file_name in os.listdir(folder_path):
             if file_name.endswith(".json"):
                 file_path = folder_path / file_name
-                tournament = cls.from_json(file_path)
-                cls.tournaments.append(tournament)
+                cls.from_json(file_path)
 
     # ABLE TO UPDATE AND LOAD FROM JSON FILE
-    def load_from_json(self):
+    def load_from_json(self, data=None):
+        """
+        Loads the tournament from its file, or from data (the content of the file, already read).
+        The file is streamed: players and rounds are built one entry at a time.
+        """
         if self.filepath:
-            with open(self.filepath) as fp:
-                data = json.load(fp)
-                self.name = data.get("name", "")
-                self.venue = data.get("venue", "")
-                self.start_date = data["dates"].get("from", "")
-                self.end_date = data["dates"].get("to", "")
-                self.num_rounds = data.get("number_of_rounds", 0)
-                self.current_round = data.get("current_round", 0)
-                self.completed = data.get("completed", False)
-                self.finished = data.get("finished", False)
-                self.rounds = data.get("rounds", [])
-
-                # Handle player information format
-                self.registered_players = []
-                for player in data.get("players", []):
-                    if isinstance(player, str):
-                        # Player is represented by chess_id only
-                        self.registered_players.append(
-                            PlayerDetails(
-                                name="", email="", chess_id=player, birthday=""
-                            )
-                        )
-                    elif isinstance(player, dict):
-                        # Player has detailed information
-                        self.registered_players.append(
-                            PlayerDetails(
-                                name=player.get("name", ""),
-                                email=player.get("email", ""),
-                                chess_id=player.get("chess_id", ""),
-                                birthday=player.get("birthday", ""),
-                                points=player.get("points", 0),
-                            )
-                        )
+            # In shared mode, the file and its journal are read under the lock, as a whole
+            with self._file_lock():
+                self._read_file(None if self.shared else data)
         else:
             raise ValueError("Filepath is not provided")
 
+    def _read_file(self, data=None):
+        """Reads the file (or data) and replays the journal"""
+        if data is None:
+            events = stream_events(self.filepath, STREAMED_FIELDS)
+        else:
+            events = data_events(data, STREAMED_FIELDS)
+
+        fields = {}
+        players = []
+        rounds = []
+        for kind, key, value in events:
+            if kind == "field":
+                fields[key] = value
+            elif key == "rounds":
+                rounds.append(value)
+            elif not isinstance(value, (str, dict)):
+                continue
+            elif isinstance(players, PlayerTable):
+                players.add_entry(value)
+            elif len(players) < LARGE_ROSTER:
+                players.append(player_details(value))
+            else:
+                # Large roster: the players read so far move to a table
+                table = PlayerTable()
+                for player in players:
+                    table.append(player)
+                table.add_entry(value)
+                players = table
+
+        self.name = fields.get("name", "")
+        self.venue = fields.get("venue", "")
+        self.start_date = fields["dates"].get("from", "")
+        self.end_date = fields["dates"].get("to", "")
+        self.num_rounds = fields.get("number_of_rounds", 0)
+        self.current_round = fields.get("current_round", 0)
+        self.completed = fields.get("completed", False)
+        self.finished = fields.get("finished", False)
+        # Rounds that are not an array (null) are kept as they are
+        self.rounds = fields.get("rounds", rounds)
+        self.registered_players = players
+
+        self._file_version = fields.get("version", 0)
+        self.replay_journal()
+        self._mtime = os.path.getmtime(self.filepath)
+        self._file_stat = file_stat(self.filepath)
+        self.mark_clean()
+
     def to_dict(self):
         return {
             "name": self.name,
             "venue": self.venue,
             "dates": {"from": self.start_date, "to": self.end_date},
             "players": [
-                player.make_dict() if isinstance(player, PlayerDetails) else player
+                player if isinstance(player, dict) else player.make_dict()
                 for player in self.registered_players
             ],
             "number_of_rounds": self.num_rounds,
@@ -126,30 +491,52 @@ class Tournament:
         }
 
     @classmethod
-    def load_tournaments_from_folder(cls, folder_path):
+    def load_tournaments_from_folder(
+        cls, folder_path, loader=None, search=None, status=None, offset=0, limit=None
+    ):
+        """
+        Loads the tournaments of a folder (one per tournament name).
+        With search, status, offset or limit, only the matching page of tournaments is loaded
+        (see TournamentRepository.list).
+        """
         tournaments = []
         loaded_tournament_names = set()  # Track loaded tournament names
 
-        for file_name in os.listdir(folder_path):
-            if file_name.endswith(".json"):
-                file_path = folder_path / file_name
-                try:
+        paths = json_files(folder_path)
+        if search is not None or status is not None or offset or limit is not None:
+            # Imported here: the repository module imports this one
+            from .tournament_repository import TournamentRepository
 
-                    tournament = cls.from_json(file_path)
-
-                    # Check if tournament name already exists
-                    if tournament.name in loaded_tournament_names:
-                        continue
+            summaries = TournamentRepository.get(folder_path).list(
+                search, status, offset, limit
+            )
+            paths = [summary.filepath for summary in summaries]
 
-                    tournaments.append(tournament)
-                    loaded_tournament_names.add(tournament.name)
+        # The files are read and decoded concurrently, in the order of their names
+        result = (loader or Loader()).load(paths, read_json)
+        errors = list(result.errors)
 
-                except json.JSONDecodeError as e:
-                    print(f"Error loading JSON file {file_name}: {e}")
-                except KeyError as e:
-                    print(f"KeyError in JSON file {file_name}: {e}")
-                except Exception as e:
-                    print(f"An error occurred while processing {file_name}: {e}")
+        for file_path, data in result.items:
+            try:
+                tournament = cls.from_json(file_path, data)
+            except Exception as e:
+                errors.append((file_path, e))
+                continue
+
+            # Check if tournament name already exists
+            if tournament.name in loaded_tournament_names:
+                continue
+
+            tournaments.append(tournament)
+            loaded_tournament_names.add(tournament.name)
+
+        for file_path, e in errors:
+            if isinstance(e, json.JSONDecodeError):
+                print(f"Error loading JSON file {file_path.name}: {e}")
+            elif isinstance(e, KeyError):
+                print(f"KeyError in JSON file {file_path.name}: {e}")
+            else:
+                print(f"An error occurred while processing {file_path.name}: {e}")
 
         return tournaments
 
@@ -158,28 +545,81 @@ class Tournament:
         base_dir = Path(__file__).resolve().parent.parent
         data_folder = base_dir / "data" / "tournaments"
         for tournament in cls.tournaments:
+            if not tournament.dirty:
+                continue
+            if tournament.filepath or tournament._storage is not None:
+                # Also folds the journal in the file
+                tournament.save()
+                continue
             file_path = data_folder / f"{tournament.name.replace(' ', '_')}.json"
             with open(file_path, "w") as fp:
                 json.dump(tournament.to_dict(), fp, indent=4)
+            tournament.mark_clean()
 
+    @profiled("io")
     def save(self):
-        if self.filepath:
-            tournament_data = self.to_dict()
-            tournament_data["filepath"] = str(self.filepath)
-            with open(self.filepath, "w") as f:
-                json.dump(tournament_data, f, indent=4)
+        """Writes the whole tournament to its file; the journal is then folded in, and cleared"""
+        if self._storage is not None:
+            self._storage.save_tournament(self)
+            self.mark_clean()
+        elif self.filepath:
+            # In shared mode, the changes of the other processes are written too
+            with self.locked():
+                self.prepare_write()()
         else:
             print("Filepath not set. Cannot save tournament.")
 
+    def save_later(self):
+        """
+        Hands the save over to the autosaver (see models.autosave): the data is taken now, and
+        written in the background. Saved right away when the autosaver is not running.
+        """
+        if (
+            self._storage is not None
+            or not self.filepath
+            or not autosaver.running
+            or self.shared
+        ):
+            # A shared tournament is written under its lock
+            self.save()
+            return
+        autosaver.submit(str(self.filepath), self.prepare_write())
+
+    def prepare_write(self):
+        """
+        Takes the data of the tournament file now; returns the function writing it.
+        The changes made in between are kept: in the journal, and as unsaved (dirty).
+        """
+        filepath = self.filepath
+        tournament_data = self.to_dict()
+        tournament_data["filepath"] = str(filepath)
+        # Each write of the file gets the next version number
+        self._file_version += 1
+        tournament_data["version"] = self._file_version
+        # Serialized here: the rounds and players keep changing while the autosaver writes
+        text = json.dumps(tournament_data, indent=4)
+        version = self._version
+        previous_journal = self._journal
+        journal = self.journal
+        position = journal.position
+
+        def write():
+            with open_atomic(filepath) as fp:
+                fp.write(text)
+            if previous_journal is not None and previous_journal is not journal:
+                # Journal of the previous file, if the tournament was renamed
+                previous_journal.clear()
+            journal.drop(position)
+            self._mtime = os.path.getmtime(filepath)
+            self._file_stat = file_stat(filepath)
+            self._saved_version = version
+            self.register(self)
+
+        return write
+
     def display_all_tournaments(self):
         sorted_tournaments = sorted(
-            self.tournaments,
-            key=lambda t: (
-                datetime.strptime(t.start_date, "%d-%m-%Y")
-                if t.start_date
-                else datetime.min
-            ),
-            reverse=True,
+            self.tournaments, key=lambda t: t.start_ordinal, reverse=True
         )
 
         for i, tournament in enumerate(sorted_tournaments, start=1):
@@ -224,84 +664,53 @@ class Tournament:
                 print(f"  Winner: {winner_message}")
                 print()
 
-    @classmethod
-    def from_json(cls, filepath: Path):
-        with open(filepath) as fp:
-            try:
-                data = json.load(fp)
-            except json.JSONDecodeError as e:
-                print(f"Error decoding JSON file {filepath}: {e}")
-                return None
+    @staticmethod
+    def identity_key(filepath):
+        return str(Path(filepath).resolve())
 
-        # Extract and parse dates
-        dates = data.get("dates", {})
-        start_date_str = dates.get("from", "")
-        end_date_str = dates.get("to", "")
+    @classmethod
+    def register(cls, tournament, key=None):
+        """
+        Adds a tournament to the identity map (and the list of tournaments) under its file path,
+        or under key for a tournament that is not kept in a file
+        """
+        for key, other in list(cls.loaded.items()):
+            if other is tournament:
+                # Registered under a previous file name
+                del cls.loaded[key]
+                break
+        else:
+            cls.tournaments.append(tournament)
+        cls.loaded[key or cls.identity_key(tournament.filepath)] = tournament
 
+    @classmethod
+    @profiled("io")
+    def from_json(cls, filepath: Path, data=None):
+        """Loads a tournament file; data is the content of the file if it was already read"""
+        tournament = cls.loaded.get(cls.identity_key(filepath))
+        if tournament is not None:
+            # Already in memory: reloaded only if the file changed and there is nothing to save
+            mtime = os.path.getmtime(filepath)
+            if not tournament.dirty and tournament._mtime != mtime:
+                tournament.load_from_json(data)
+            return tournament
+
+        # The fields, players and rounds are read by load_from_json (called by the constructor)
         try:
-            # Attempt to parse dates with format %d-%m-%Y
-            start_date = datetime.strptime(start_date_str, "%d-%m-%Y").strftime(
-                "%d-%m-%y"
+            tournament = cls(
+                name="",
+                venue="",
+                start_date="",
+                end_date="",
+                registered_players=[],
+                filepath=filepath,
+                data=data,
             )
-            end_date = datetime.strptime(end_date_str, "%d-%m-%Y").strftime("%d-%m-%y")
-        except ValueError as e1:
-            print(f"Error parsing dates with format %d-%m-%Y: {e1}")
-            try:
-                # Attempt to parse dates with format %m-%d-%Y
-                start_date = datetime.strptime(start_date_str, "%m-%d-%Y").strftime(
-                    "%d-%m-%y"
-                )
-                end_date = datetime.strptime(end_date_str, "%m-%d-%Y").strftime(
-                    "%d-%m-%y"
-                )
-            except ValueError as e2:
-                print(f"Error parsing dates with format %d-%m-%Y: {e2}")
-                start_date = end_date = ""  # Handle error case gracefully
-
-        # Handling players
-        players_data = data.get("players", [])
-
-        if all(isinstance(player_data, str) for player_data in players_data):
-            # Assume chess IDs
-            registered_players = [
-                PlayerDetails(name="", email="", chess_id=player_data, birthday="")
-                for player_data in players_data
-            ]
-        else:
-            # Assume it's detailed player information
-            registered_players = [
-                PlayerDetails(
-                    name=player_data.get("name", ""),
-                    email=player_data.get("email", ""),
-                    chess_id=player_data.get("chess_id", ""),
-                    birthday=player_data.get("birthday", ""),
-                    points=player_data.get("points", 0),
-                )
-                for player_data in players_data
-            ]
-
-        # Other fields
-        num_rounds = data.get("number_of_rounds", 0)
-        current_round = data.get("current_round", 0)
-        completed = data.get("completed", False)
-        finished = data.get("finished", False)
-        rounds = data.get("rounds", [])
-
-        tournament = cls(
-            name=data.get("name", ""),
-            venue=data.get("venue", ""),
-            start_date=start_date,
-            end_date=end_date,
-            registered_players=registered_players,
-            num_rounds=num_rounds,
-            current_round=current_round,
-            completed=completed,
-            finished=finished,
-            rounds=rounds,
-            filepath=filepath,
-        )
+        except json.JSONDecodeError as e:
+            print(f"Error decoding JSON file {filepath}: {e}")
+            return None
 
-        cls.tournaments.append(tournament)
+        cls.register(tournament)
         return tournament
 
     @classmethod
@@ -312,10 +721,8 @@ class Tournament:
         end_date_str = input("Enter tournament end date (DD-MM-YYYY): ")
 
         # Parse dates using the specified format
-        start_date = datetime.strptime(start_date_str, DATE_FORMAT).strftime(
-            DATE_FORMAT
-        )
-        end_date = datetime.strptime(end_date_str, DATE_FORMAT).strftime(DATE_FORMAT)
+        start_date = format_ordinal(parse_ordinal(start_date_str))
+        end_date = format_ordinal(parse_ordinal(end_date_str))
 
         num_rounds = int(input("Enter number of rounds: "))
         current_round = int(input("Enter current round: "))
@@ -376,9 +783,9 @@ class Tournament:
             folder_path.mkdir(parents=True)
 
         instance.filepath = file_path
+        # Also registers the tournament
         instance.save()
 
-        cls.tournaments.append(instance)
         return instance
 
 
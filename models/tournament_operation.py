@@ -1,5 +1,11 @@
 from typing import List, Tuple, Union
 import random
+from models.pairing import (
+    SwissPairingEngine,
+    add_points,
+    player_chess_id,
+    player_points,
+)
 from models.tournament import Tournament, PlayerDetails
 
 PlayerType = Union[PlayerDetails, dict]
@@ -13,92 +19,110 @@ class TournamentOperations:
         if previous_pairings is None:
             previous_pairings = set()
 
+        # Rematches and byes are avoided based on the rounds already played
+        byes = TournamentOperations.pairing_history(tournament, previous_pairings)
+
         return TournamentOperations.generate_swiss_pairings(
-            tournament.registered_players, previous_pairings
+            tournament.registered_players, previous_pairings, byes
         )
 
+    @staticmethod
+    def pairing_history(tournament: Tournament, previous_pairings: set) -> set:
+        """Adds the pairs of the rounds paired so far to previous_pairings; returns the byes"""
+        byes = set()
+        for round_matches in tournament.rounds or []:
+            for match in round_matches:
+                match_players = match.get("players", [])
+                if len(match_players) == 2:
+                    previous_pairings.add(tuple(match_players))
+                elif len(match_players) == 1:
+                    byes.add(match_players[0])
+        return byes
+
+    @staticmethod
+    def pairing_matches(pairings) -> List[dict]:
+        """Matches (not played yet) of a round, from its pairings"""
+        return [
+            {
+                "players": [player_chess_id(p) for p in (player1, player2) if p],
+                "completed": False,
+            }
+            for player1, player2 in pairings
+        ]
+
+    @staticmethod
+    def round_matches(
+        tournament: Tournament, round_number: int = None, matches: List[dict] = None
+    ) -> List[dict]:
+        """
+        Matches of a round (the current one by default). The round is paired, and its matches
+        recorded in the tournament, only if it has none yet: once paired, a round is read back
+        from the tournament (and its file) instead of being paired again.
+        matches are the matches of the round if they were paired in advance (see NextRoundPairing).
+        """
+        # In shared mode, another arbiter may have paired the round already
+        with tournament.locked():
+            round_number = round_number or tournament.current_round or 1
+            if tournament.rounds is None:
+                tournament.rounds = []
+            rounds = tournament.rounds
+            if len(rounds) >= round_number and rounds[round_number - 1]:
+                return rounds[round_number - 1]
+
+            if matches is None:
+                matches = TournamentOperations.pairing_matches(
+                    TournamentOperations.generate_pairings_from_tournament(tournament)
+                )
+            tournament.set_pairings(round_number, matches)
+            return tournament.rounds[round_number - 1]
+
     @staticmethod
     def generate_swiss_pairings(
-        players: List[PlayerType], previous_pairings: set = None
+        players: List[PlayerType], previous_pairings: set = None, byes: set = None
     ) -> List[Tuple[PlayerType, PlayerType]]:
+        """
+        Pairs the players for the next round (see SwissPairingEngine).
+        The new pairings are added to previous_pairings; the list of players is left untouched.
+        """
         if previous_pairings is None:
             previous_pairings = set()
 
-        # Sort players by points
-        players.sort(
-            key=lambda player: (
-                player.points if isinstance(player, PlayerDetails) else player["points"]
-            ),
-            reverse=True,
-        )
-
-        paired_players = []
-        paired_ids = set()
-
-        for i in range(0, len(players), 2):
-            player1 = players[i]
-            player2 = players[i + 1] if i + 1 < len(players) else None
+        engine = SwissPairingEngine(previous_pairings, byes)
+        pairings = engine.pair(players)
 
-            player1_id = (
-                player1.chess_id
-                if isinstance(player1, PlayerDetails)
-                else player1["chess_id"]
-            )
-            player2_id = (
-                player2.chess_id
-                if player2 and isinstance(player2, PlayerDetails)
-                else player2["chess_id"] if player2 else None
-            )
+        for player1, player2 in pairings:
+            if player2 is not None:
+                previous_pairings.add(
+                    (player_chess_id(player1), player_chess_id(player2))
+                )
 
-            if (
-                player1
-                and player2
-                and (player1_id, player2_id) not in previous_pairings
-                and (player2_id, player1_id) not in previous_pairings
-            ):
-                paired_players.append((player1, player2))
-                paired_ids.add(player1_id)
-                paired_ids.add(player2_id)
-                # Add this pairing to previous pairings to avoid future repeats
-                previous_pairings.add((player1_id, player2_id))
-            elif player2 is None:
-                paired_players.append((player1, None))
-
-        return paired_players
+        return pairings
 
     @staticmethod
     def play_round(
-        pairings: List[Tuple[PlayerType, PlayerType]]
+        pairings: List[Tuple[PlayerType, PlayerType]], rng=None
     ) -> List[Tuple[PlayerType, PlayerType, str]]:
+        """
+        Plays a round with random results. rng is the random generator to use (for instance
+        a seeded random.Random), the random module by default.
+        """
+        rng = rng or random
         results = []
 
         for player1, player2 in pairings:
             if player2 is None:
-                if isinstance(player1, PlayerDetails):
-                    player1.points += 1
-                else:
-                    player1["points"] += 1
+                add_points(player1, 1)
                 results.append((player1, None, "bye"))
             else:
-                result = random.choice(["win", "draw", "loss"])
+                result = rng.choice(["win", "draw", "loss"])
 
                 if result == "win":
-                    if isinstance(player1, PlayerDetails):
-                        player1.points += 1
-                    else:
-                        player1["points"] += 1
+                    add_points(player1, 1)
                 elif result == "draw":
-                    if isinstance(player1, PlayerDetails):
-                        player1.points += 0.5
-                        player2.points += 0.5
-                    else:
-                        player1["points"] += 0.5
-                        player2["points"] += 0.5
+                    add_points(player1, 0.5)
+                    add_points(player2, 0.5)
                 elif result == "loss":
-                    if isinstance(player2, PlayerDetails):
-                        player2.points += 1
-                    else:
-                        player2["points"] += 1
+                    add_points(player2, 1)
 
                 results.append((player1, player2, result))
 
@@ -106,23 +130,26 @@ class TournamentOperations:
 
     @staticmethod
     def sort_players(players: List[PlayerType]) -> List[PlayerType]:
-        return sorted(
-            players,
-            key=lambda player: (
-                player.points if isinstance(player, PlayerDetails) else player["points"]
-            ),
-            reverse=True,
-        )
+        return sorted(players, key=player_points, reverse=True)
 
     @staticmethod
     def print_rankings(players: List[PlayerType]):
         print("Rankings:")
         for i, player in enumerate(players, 1):
-            points = (
-                player.points if isinstance(player, PlayerDetails) else player["points"]
-            )
+            name = player["name"] if isinstance(player, dict) else player.name
+            print(f"{i}. {name}: {player_points(player)} points")
+        print("********************")
+        print()
+
+    @staticmethod
+    def print_standings(standings, top=None):
+        """Prints the rankings with the tiebreak columns (Buchholz, Sonneborn-Berger)"""
+        print("Rankings:")
+        for rank, player, points, buchholz, sonneborn_berger in standings.rows(top):
+            name = player["name"] if isinstance(player, dict) else player.name
             print(
-                f"{i}. {player.name if isinstance(player, PlayerDetails) else player['name']}: {points} points"
+                f"{rank}. {name or player_chess_id(player)}: {points} points"
+                f" (Buchholz: {buchholz}, SB: {sonneborn_berger})"
             )
         print("********************")
         print()
@@ -0,0 +1,188 @@
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import ClassVar, Dict, List, Optional
+
+from .dates import sort_ordinal
+from .streaming import read_fields
+from .tournament import STREAMED_FIELDS, Tournament
+
+INDEX_FILENAME = ".tournament-index"
+
+
+@dataclass
+class TournamentSummary:
+    """An index entry: what is needed to list a tournament without loading its players and rounds"""
+
+    name: str
+    venue: str
+    start_date: str
+    end_date: str
+    status: str
+    filename: str
+    mtime: float
+    # Start date as a day ordinal, to sort the tournaments without parsing dates
+    start_ordinal: int
+    folder: Optional[Path] = None
+
+    @property
+    def filepath(self):
+        return Path(self.folder) / self.filename
+
+    @classmethod
+    def from_data(cls, data, filepath: Path, mtime: float):
+        """Builds the summary from the parsed content of a tournament file"""
+        dates = data.get("dates") or {}
+        if data.get("finished"):
+            status = "finished"
+        elif data.get("completed"):
+            status = "completed"
+        else:
+            status = "in progress"
+
+        return cls(
+            name=data.get("name", ""),
+            venue=data.get("venue", ""),
+            start_date=dates.get("from", ""),
+            end_date=dates.get("to", ""),
+            status=status,
+            filename=filepath.name,
+            mtime=mtime,
+            start_ordinal=sort_ordinal(dates.get("from", "")),
+            folder=filepath.parent,
+        )
+
+    def matches(self, search=None, status=None):
+        """True if the name or venue contains search (ignoring case), and the status is status"""
+        if status is not None and self.status != status:
+            return False
+        if search:
+            search = search.lower()
+            return search in self.name.lower() or search in self.venue.lower()
+        return True
+
+    def serialize(self):
+        data = asdict(self)
+        del data["folder"]
+        return data
+
+
+class TournamentRepository:
+    """
+    Gives access to the tournaments stored as JSON files in a folder.
+
+    Listing only reads a small index file kept in the same folder: a file is parsed again only when
+    its modification time changed. The players and rounds are loaded when a tournament is opened.
+    """
+
+    repositories: ClassVar[Dict[Path, "TournamentRepository"]] = {}
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self.index_path = self.folder / INDEX_FILENAME
+        self.index: Dict[str, TournamentSummary] = self.read_index()
+        # Modification time of the files that could not be parsed (reported once)
+        self.failed: Dict[str, float] = {}
+
+    @classmethod
+    def get(cls, folder):
+        """Returns the repository for a folder, so that its index is shared"""
+        folder = Path(folder).resolve()
+        if folder not in cls.repositories:
+            cls.repositories[folder] = cls(folder)
+        return cls.repositories[folder]
+
+    def read_index(self):
+        try:
+            with open(self.index_path) as fp:
+                entries = json.load(fp)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+        index = {}
+        for entry in entries:
+            try:
+                summary = TournamentSummary(folder=self.folder, **entry)
+            except TypeError:
+                # Unknown index layout: the file will be parsed again
+                continue
+            index[summary.filename] = summary
+        return index
+
+    def write_index(self):
+        with open(self.index_path, "w") as fp:
+            json.dump([s.serialize() for s in self.index.values()], fp)
+
+    def refresh(self):
+        """Updates the index from the tournament files whose modification time changed"""
+        changed = False
+        seen = set()
+
+        for entry in os.scandir(self.folder):
+            if not entry.is_file() or not entry.name.endswith(".json"):
+                continue
+
+            seen.add(entry.name)
+            mtime = entry.stat().st_mtime
+            summary = self.index.get(entry.name)
+            if (summary and summary.mtime == mtime) or self.failed.get(
+                entry.name
+            ) == mtime:
+                continue
+
+            try:
+                # The players and rounds are not needed for the index: they are skipped
+                data = read_fields(entry.path, STREAMED_FIELDS)
+            except json.JSONDecodeError as e:
+                print(f"Error loading JSON file {entry.name}: {e}")
+                self.failed[entry.name] = mtime
+                continue
+
+            self.failed.pop(entry.name, None)
+            self.index[entry.name] = TournamentSummary.from_data(
+                data, Path(entry.path), mtime
+            )
+            changed = True
+
+        for filename in set(self.index) - seen:
+            del self.index[filename]
+            changed = True
+
+        if changed:
+            self.write_index()
+
+    def list(
+        self, search=None, status=None, offset=0, limit=None, newest_first=False
+    ) -> List[TournamentSummary]:
+        """
+        Lists the tournaments from the index (one per tournament name), by file name, or by start
+        date (the latest first) if newest_first is True.
+        search keeps the tournaments whose name or venue contains it (ignoring case), status the
+        ones with this status; offset and limit select a page of the result.
+        """
+        self.refresh()
+
+        summaries = []
+        names = set()
+        for filename in sorted(self.index):
+            summary = self.index[filename]
+            if summary.name in names:
+                continue
+            names.add(summary.name)
+            if summary.matches(search, status):
+                summaries.append(summary)
+
+        if newest_first:
+            summaries.sort(key=lambda summary: summary.start_ordinal, reverse=True)
+        end = None if limit is None else offset + limit
+        return summaries[offset:end]
+
+    def count(self, search=None, status=None) -> int:
+        """Number of tournaments list() returns without offset and limit"""
+        return len(self.list(search, status))
+
+    def open(self, summary: TournamentSummary) -> Tournament:
+        """Loads the full tournament (players and rounds) for an index entry"""
+        # Tournament keeps the loaded tournaments, so this only parses the file once
+        return Tournament.from_json(summary.filepath)
@@ -1,7 +1,11 @@
 import re
+import sys
 from abc import ABC, abstractmethod
 from datetime import datetime
 
+from models.dates import parse_date
+from models.profiling import profiler
+
 
 class BaseScreen(ABC):
     """Abstract class for screen interaction"""
@@ -62,7 +66,7 @@ class BaseScreen(ABC):
         while True:
             value = self.input_string(**kwargs)
             try:
-                dt = datetime.strptime(value, "%d-%m-%Y")
+                dt = parse_date(value)
                 if dt > datetime.now():
                     raise ValueError
                 return value
@@ -74,10 +78,145 @@ class BaseScreen(ABC):
         message = getattr(self, "display", None)
 
         if message and callable(message):
-            message = message()
+            with profiler.span(f"{type(self).__name__}.display", "render"):
+                message = message()
 
         if message:
             print(str(message))
 
         print("")
         return self.get_command()
+
+
+class PaginatedList:
+    """
+    A list displayed one page at a time.
+
+    The source is either a sequence (list, PlayerTable...), of which only the rows of the displayed page
+    are read, or an iterable (like the players of a club still being loaded), consumed as far as the
+    pages displayed. format_row(number, item) returns the line of a row (None to skip it); rows are
+    numbered from 1 across pages. Each page is written to the terminal in a single write.
+    """
+
+    PAGE_SIZE = 20
+    HELP = (
+        "Type 'N' for the next page, 'P' for the previous page "
+        "or 'G' and a number to go to a page."
+    )
+
+    def __init__(self, source, format_row, page_size=PAGE_SIZE):
+        self.source = source
+        self.format_row = format_row
+        self.page_size = page_size
+        self.page = 0
+
+        if hasattr(source, "__getitem__") and hasattr(source, "__len__"):
+            self.iterator = None
+            self.rows = source
+        else:
+            # Rows read from the iterable so far
+            self.iterator = iter(source)
+            self.rows = []
+
+    def _fill(self, count):
+        """Reads rows from the iterable until there are count of them (or it is exhausted)"""
+        while self.iterator is not None and len(self.rows) < count:
+            try:
+                self.rows.append(next(self.iterator))
+            except StopIteration:
+                self.iterator = None
+
+    def page_count(self):
+        """Number of pages, None while the iterable is not exhausted"""
+        if self.iterator is not None:
+            return None
+        return max(1, -(-len(self.rows) // self.page_size))
+
+    def page_rows(self, page):
+        """(number, item) for the rows of a page"""
+        start = page * self.page_size
+        end = start + self.page_size
+        # One more row, to know whether this is the last page
+        self._fill(end + 1)
+        return [(i + 1, self.rows[i]) for i in range(start, min(end, len(self.rows)))]
+
+    def render(self, page):
+        lines = []
+        for number, item in self.page_rows(page):
+            line = self.format_row(number, item)
+            if line is not None:
+                lines.append(line)
+
+        count = self.page_count()
+        if count != 1:
+            total = "" if count is None else f"/{count}"
+            lines.append(f"-- Page {page + 1}{total} --")
+        return "\n".join(lines) + "\n"
+
+    def show(self, page=None):
+        """Displays a page (by default, the current one)"""
+        if page is not None:
+            self.page = page
+        sys.stdout.write(self.render(self.page))
+        sys.stdout.flush()
+
+    def go_to(self, page):
+        """Displays a page, if it exists"""
+        self._fill(page * self.page_size + 1)
+        count = self.page_count()
+        if page < 0 or count is not None and page >= count:
+            print("No such page.")
+        else:
+            self.show(page)
+
+    def handle(self, value):
+        """Handles the paging commands typed on a screen: returns True if value was one"""
+        value = value.strip().upper()
+        if value == "N":
+            self.go_to(self.page + 1)
+        elif value == "P":
+            self.go_to(self.page - 1)
+        elif value.startswith("G") and value[1:].strip().isdigit():
+            self.go_to(int(value[1:]) - 1)
+        else:
+            return False
+        return True
+
+    def browse(self):
+        """Displays the first page, then other pages on demand until an empty line is typed"""
+        self.show(0)
+        while self.page_count() != 1:
+            value = input(self.HELP + " Press Enter to continue: ")
+            if not value.strip():
+                break
+            if not self.handle(value):
+                print("Invalid choice.")
+
+
+class PagedQuery:
+    """
+    A sequence read one page at a time, for the PaginatedList of a database query.
+
+    count() returns the number of rows, and fetch(offset, limit) the rows of a page: only the
+    pages read are fetched (and kept).
+    """
+
+    def __init__(self, count, fetch, page_size=PaginatedList.PAGE_SIZE):
+        self.count = count
+        self.fetch = fetch
+        self.page_size = page_size
+        self.pages = {}
+        self.length = None
+
+    def __len__(self):
+        if self.length is None:
+            self.length = self.count()
+        return self.length
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        page, row = divmod(index, self.page_size)
+        if page not in self.pages:
+            self.pages[page] = self.fetch(page * self.page_size, self.page_size)
+        return self.pages[page][row]
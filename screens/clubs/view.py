@@ -1,6 +1,6 @@
 from commands import ClubListCmd, NoopCmd
 
-from ..base_screen import BaseScreen
+from ..base_screen import BaseScreen, PagedQuery, PaginatedList
 
 
 class ClubView(BaseScreen):
@@ -8,25 +8,79 @@ class ClubView(BaseScreen):
 
     def __init__(self, club):
         self.club = club
+        if club.storage is not None:
+            # Only the players of the pages displayed are read from the database
+            source = PagedQuery(
+                lambda: club.storage.count_players(club),
+                lambda offset, limit: club.storage.load_players(
+                    club, offset=offset, limit=limit
+                ),
+            )
+        else:
+            # Pages are displayed as soon as their players are read from the club file
+            source = club.iter_players()
+        self.pages = PaginatedList(source, lambda idx, p: f"{idx} {p.name} {p.email}")
 
     def display(self):
-        """Displays the club name and a list of players in the club (with numbers)"""
+        """Displays the club name and a page of the players in the club (with numbers)"""
         print("##", self.club.name)
-        for idx, p in enumerate(self.club.players, 1):
-            print(idx, p.name, p.email)
+        self.pages.show()
 
     def get_command(self):
         """Gets the command for this screen"""
         while True:
             print("Select a player to view/edit it, or 'C' to create a new player.")
+            print("Type 'F' to find a player by name, email or Chess ID.")
             print("Type 'B' to go back to main menu.")
+            print(self.pages.HELP)
             value = self.input_string()
-            if value.upper() == "B":
+            if self.pages.handle(value):
+                continue
+            elif value.upper() == "B":
                 return ClubListCmd()
             elif value.upper() == "C":
                 return NoopCmd("player-create", club=self.club)
+            elif value.upper() == "F":
+                player = self.find_player()
+                if player:
+                    return NoopCmd("player-view", club=self.club, player=player)
             elif value.isdigit():
-                value = int(value)
-                return NoopCmd(
-                    "player-view", club=self.club, player=self.club.players[value - 1]
-                )
+                player = self.select_player(int(value))
+                if player:
+                    return NoopCmd("player-view", club=self.club, player=player)
+                print("Invalid player number.")
+
+    def select_player(self, number):
+        """The player with this number in the list (None if there is none)"""
+        club = self.club
+        if club.storage is not None:
+            # Only this row is read from the database
+            if 1 <= number <= club.storage.count_players(club):
+                return club.storage.load_players(club, offset=number - 1, limit=1)[0]
+            return None
+        if 1 <= number <= len(club.players):
+            return club.players[number - 1]
+        return None
+
+    def find_player(self):
+        """Searches the players of the club, and returns the one selected (None if none is)"""
+        query = self.input_string("Name, email or Chess ID")
+        found_players = []
+        if self.club.storage is not None and query:
+            # Players containing the query, found by the database
+            found_players = self.club.storage.load_players(
+                self.club, search=query, limit=20
+            )
+        if not found_players:
+            # Prefixes and typos allowed
+            found_players = self.club.search(query)
+        if not found_players:
+            print("No players found matching the search criteria.")
+            return None
+
+        for idx, player in enumerate(found_players, 1):
+            print(f"{idx}. {player.name} {player.email} (Chess ID: {player.chess_id})")
+        value = self.input_string("Select a player (press enter to go back)")
+        if value.isdigit() and 1 <= int(value) <= len(found_players):
+            return found_players[int(value) - 1]
+        return None
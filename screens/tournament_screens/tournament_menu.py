@@ -1,32 +1,52 @@
 import os
 import json
 from pathlib import Path
-from ..base_screen import BaseScreen
+from ..base_screen import BaseScreen, PagedQuery, PaginatedList
 from commands import NoopCmd
 from commands.context import Context
+from models import get_storage
+from models.player_directory import TOURNAMENT
 from models.tournament import Tournament, PlayerDetails
-from datetime import datetime
 
 
 class TournamentMenu(BaseScreen):
     """Menu for tournament operations"""
 
-    def __init__(self, tournaments):
-        self.tournaments = tournaments
-        self.sorted_tournaments = sorted(
-            self.tournaments,
-            key=lambda t: datetime.strptime(t.start_date, "%d-%m-%Y"),
-            reverse=True,
+    def __init__(self, repository):
+        self.repository = repository
+        # Filter of the list (see filter_tournaments)
+        self.search = None
+        self.status = None
+        self.pages = None
+        self.list_tournaments()
+
+    def list_tournaments(self):
+        """
+        Lists the tournaments (the latest first) as index entries (TournamentSummary): only the
+        pages displayed are read from the repository, and the tournaments are opened through it
+        """
+        self.sorted_tournaments = PagedQuery(
+            lambda: self.repository.count(self.search, self.status),
+            lambda offset, limit: self.repository.list(
+                self.search, self.status, offset, limit, newest_first=True
+            ),
         )
 
     def display(self):
         print("Tournaments:")
-        # Display sorted tournaments
-        for idx, tournament in enumerate(self.sorted_tournaments, 1):
-            print(
-                f"{idx}. {tournament.name} at {tournament.venue} from {tournament.start_date} to "
-                f"{tournament.end_date}"
+        if self.search or self.status:
+            filters = " and ".join(filter(None, [self.search, self.status]))
+            print(f"(Filtered by {filters})")
+        # Display a page of the sorted tournaments (the pages start over when they were sorted again)
+        if self.pages is None or self.pages.source is not self.sorted_tournaments:
+            self.pages = PaginatedList(
+                self.sorted_tournaments,
+                lambda idx, tournament: (
+                    f"{idx}. {tournament.name} at {tournament.venue} from "
+                    f"{tournament.start_date} to {tournament.end_date}"
+                ),
             )
+        self.pages.show()
 
     def get_command(self):
         while True:
@@ -34,14 +54,19 @@ class TournamentMenu(BaseScreen):
                 "Type the number of a tournament to view/manage it, 'E' to edit, 'C' to create a new tournament,"
                 " 'L' to see a list of registered players, or 'S' to search for a player."
             )
+            print("Type 'F' to filter the tournaments by name, venue or status.")
             print("Type 'X' to exit.")
+            print(self.pages.HELP)
             value = self.input_string()
-            if value.isdigit():
+            if self.pages.handle(value):
+                continue
+            elif value.isdigit():
                 value = int(value)
                 if value in range(1, len(self.sorted_tournaments) + 1):
-                    return NoopCmd(
-                        "tournament-view", tournament=self.sorted_tournaments[value - 1]
+                    tournament = self.repository.open(
+                        self.sorted_tournaments[value - 1]
                     )
+                    return NoopCmd("tournament-view", tournament=tournament)
                 else:
                     print("Invalid tournament number.")
             elif value.upper() == "C":
@@ -56,7 +81,9 @@ class TournamentMenu(BaseScreen):
                     index = int(tournament_idx) - 1
                     if 0 <= index < len(self.sorted_tournaments):
                         # Retrieve the tournament using the index
-                        tournament = self.sorted_tournaments[index]
+                        tournament = self.repository.open(
+                            self.sorted_tournaments[index]
+                        )
 
                         # Collect updates for the tournament
                         updates = self.collect_tournament_updates(tournament)
@@ -72,20 +99,17 @@ class TournamentMenu(BaseScreen):
                             # Create and execute the update command
                             original_name = tournament.name  # Track the original name
                             self.update_tournament(tournament, **updates)
-                            # Check if the tournament name was changed
-                            if original_name != tournament.name:
+                            # Check if the tournament name was changed (and it has a file)
+                            if (
+                                original_name != tournament.name
+                                and tournament.filepath
+                            ):
                                 self.remove_old_tournament_file(original_name)
                             print(
                                 f"Tournament '{tournament.name}' updated successfully."
                             )
                             # Update the sorted list to reflect changes
-                            self.sorted_tournaments = sorted(
-                                self.tournaments,
-                                key=lambda t: datetime.strptime(
-                                    t.start_date, "%d-%m-%Y"
-                                ),
-                                reverse=True,
-                            )
+                            self.list_tournaments()
                             self.display()
                     else:
                         print("Invalid tournament number.")
@@ -93,20 +117,25 @@ class TournamentMenu(BaseScreen):
                     print("Invalid tournament number.")
             elif value.upper() == "L":
                 self.extract_players()
-                self.sorted_tournaments = sorted(
-                    self.tournaments,
-                    key=lambda t: datetime.strptime(t.start_date, "%d-%m-%Y"),
-                    reverse=True,
-                )
+                self.list_tournaments()
+                self.display()
+            elif value.upper() == "F":
+                self.filter_tournaments()
+                self.list_tournaments()
                 self.display()
             elif value.upper() == "S":
                 tournament_idx = input(
-                    "Enter the number of the tournament to search players in: "
-                )
-                if tournament_idx.isdigit():
+                    "Enter the number of the tournament to search players in "
+                    "(or nothing to search all tournaments and clubs): "
+                ).strip()
+                if not tournament_idx:
+                    self.search_all_players()
+                elif tournament_idx.isdigit():
                     index = int(tournament_idx) - 1
                     if 0 <= index < len(self.sorted_tournaments):
-                        tournament = self.sorted_tournaments[index]
+                        tournament = self.repository.open(
+                            self.sorted_tournaments[index]
+                        )
                         self.search_player(tournament)
                     else:
                         print("Invalid tournament number.")
@@ -115,6 +144,18 @@ class TournamentMenu(BaseScreen):
             elif value.upper() == "X":
                 return Context(run=False)
 
+    def filter_tournaments(self):
+        """Asks for the text and status the listed tournaments must have (nothing for all)"""
+        self.search = (
+            input("Enter part of the name or venue (or nothing for all): ").strip()
+            or None
+        )
+        statuses = {"1": "in progress", "2": "completed", "3": "finished"}
+        choice = input(
+            "Status: 1. In progress, 2. Completed, 3. Finished (or nothing for all): "
+        ).strip()
+        self.status = statuses.get(choice)
+
     @staticmethod
     def collect_tournament_updates(tournament):
         """Collect updates for an existing tournament."""
@@ -124,7 +165,10 @@ class TournamentMenu(BaseScreen):
             f"Enter updates for tournament '{tournament.name}' (press enter to skip): "
         )
         for key, value in tournament.__dict__.items():
-            if key == "registered_players":
+            if key.startswith("_"):
+                # Internal state (e.g. cached standings), not a tournament attribute
+                continue
+            elif key == "registered_players":
                 updated_players = []
                 for player in value:
                     print(f"\nCurrent player: {player.name}")
@@ -204,14 +248,14 @@ class TournamentMenu(BaseScreen):
 
     def update_tournament(self, tournament, **kwargs):
         """Utility method to update a tournament instance based on arguments provided"""
-        if tournament not in self.tournaments:
+        if tournament not in Tournament.tournaments:
             raise RuntimeError(f"Tournament {tournament.name} not in the list!")
 
         for key, value in kwargs.items():
             setattr(tournament, key, value)
 
-        # Update the filepath after renaming
-        if "name" in kwargs:
+        # Update the filepath after renaming (a tournament in a database keeps its key)
+        if "name" in kwargs and tournament.filepath:
             old_filepath = tournament.filepath
             new_filename = f"{kwargs['name'].replace(' ', '_')}.json"
             new_filepath = old_filepath.parent / new_filename
@@ -245,18 +289,19 @@ class TournamentMenu(BaseScreen):
     @staticmethod
     def search_player(tournament):
         """Search for a player within a specific tournament."""
-        search_term = (
-            input("Enter the Chess ID or part of the player's name to search: ")
-            .strip()
-            .lower()
-        )
+        search_term = input(
+            "Enter the Chess ID or part of the player's name or email to search: "
+        ).strip()
 
-        found_players = [
-            player
-            for player in tournament.registered_players
-            if search_term in player.chess_id.lower()
-            or search_term in player.name.lower()
-        ]
+        found_players = tournament.search_players(search_term)
+        if not found_players:
+            # Part of a word (e.g. the digits of a Chess ID) is not found by the index
+            term = search_term.lower()
+            found_players = [
+                player
+                for player in tournament.registered_players
+                if term in player.chess_id.lower() or term in player.name.lower()
+            ]
 
         if found_players:
             print("\nSearch results:")
@@ -266,27 +311,41 @@ class TournamentMenu(BaseScreen):
             print("No players found matching the search criteria.")
 
     @staticmethod
-    def load_tournament_data():
-        """Load tournament data from JSON files."""
-        base_dir = Path(__file__).resolve().parent.parent.parent
-        data_folder = base_dir / "data" / "tournaments"
-        tournament_files = data_folder.glob("*.json")
+    def extract_players():
+        # Players come from the player directory: only the files (or the database) changed since
+        # are read again
+        directory = get_storage().player_directory()
+        directory.refresh()
+        # The lines are built as the pages are displayed
+        PaginatedList(
+            TournamentMenu.player_lines(directory.list_sources(TOURNAMENT)),
+            lambda idx, line: line,
+        ).browse()
 
-        tournaments = []
-        for file_path in tournament_files:
-            tournament = Tournament.from_json(file_path)
-            if tournament:
-                tournaments.append(tournament)
+    @staticmethod
+    def player_lines(sources):
+        """Yields the lines listing the registered players of each tournament"""
+        for source in sources:
+            yield f"\nTournament: {source.name}"
+            if source.players:
+                yield "Registered Players:"
+                for chess_id, name, _ in source.players:
+                    yield f"Name: {name}, Chess ID: {chess_id}"
+            else:
+                yield "No registered players in this tournament."
 
-        return tournaments
+    @staticmethod
+    def search_all_players():
+        """Search for a player across all tournaments and clubs (prefixes and typos allowed)."""
+        search_term = input(
+            "Enter the Chess ID, name or email (or part of it) of the player to search: "
+        ).strip()
 
-    def extract_players(self):
-        tournaments = self.load_tournament_data()
-        for tournament in tournaments:
-            print(f"\nTournament: {tournament.name}")
-            if tournament.registered_players:
-                print("Registered Players:")
-                for player in tournament.registered_players:
-                    print(f"Name: {player.name}, Chess ID: {player.chess_id}")
-            else:
-                print("No registered players in this tournament.")
+        directory = get_storage().player_directory()
+        directory.refresh()
+        hits = directory.search(search_term)
+        if hits:
+            print("\nSearch results:")
+            PaginatedList(hits, lambda idx, hit: f"{idx}. {hit}").browse()
+        else:
+            print("No players found matching the search criteria.")
@@ -1,8 +1,12 @@
-from ..base_screen import BaseScreen
+from ..base_screen import BaseScreen, PaginatedList
 from pathlib import Path
 from models.tournament import PlayerDetails
 from commands import TournamentListCmd, NoopCmd
-from models import TournamentOperations
+from models import NextRoundPairing, TournamentOperations, TournamentSimulator
+from models.profiling import profiler
+
+# Number of replays of the remaining rounds for a forecast
+FORECAST_SIMULATIONS = 2000
 
 
 class TournamentView(BaseScreen):
@@ -13,28 +17,28 @@ class TournamentView(BaseScreen):
         self.tournaments = tournaments
         self.clubs = clubs
         self.tournaments_folder = tournaments_folder
+        # Pairs the next round in the background while the results are entered
+        self.next_round = NextRoundPairing(tournament)
 
-        # Generate pairings for the first round
-        self.first_round_pairings = (
-            TournamentOperations.generate_pairings_from_tournament(self.tournament)
-        )
-        self.tournament.rounds = [[] for _ in range(self.tournament.num_rounds)]
-        self.tournament.rounds[0] = [
-            {
-                "players": (
-                    [player1.chess_id, player2.chess_id]
-                    if player2
-                    else [player1.chess_id]
-                ),
-                "completed": False,
-            }
-            for player1, player2 in self.first_round_pairings
-        ]
+        # The rounds already paired are kept: only a round without matches is paired
+        rounds = self.tournament.rounds
+        if rounds is None:
+            self.tournament.rounds = rounds = []
+        while len(rounds) < self.tournament.num_rounds:
+            rounds.append([])
+        if self.tournament.finished:
+            return
+
+        matches = TournamentOperations.round_matches(self.tournament)
         # Print pairings for verification only if the current round is 1
         if self.tournament.current_round == 1:
             print("First Round Pairings:")
             print("=====================")
-            for player1, player2 in self.first_round_pairings:
+            for match in matches:
+                player1, player2 = [
+                    self.tournament.get_player(chess_id)
+                    for chess_id in (match["players"] + [None])[:2]
+                ]
                 if player2:
                     print(f"{player1.name} vs {player2.name}")
                 else:
@@ -43,63 +47,68 @@ class TournamentView(BaseScreen):
 
     def run(self):
         while True:
-            self.display_tournament_info_without_players()
+            with profiler.span("TournamentView.display", "render"):
+                self.display_tournament_info_without_players()
             command = self.get_command()
             if command:
                 return command
 
     def display_tournament_info(self):
-        print("--------------------")
-        print("Tournament Information:")
-        print(f"Name: {self.tournament.name}")
-        print(f"Venue: {self.tournament.venue}")
-        print(f"Dates: {self.tournament.start_date} to {self.tournament.end_date}")
-        print(f"Number of Rounds: {self.tournament.num_rounds}")
-        print(f"Current Round: {self.tournament.current_round}")
-        print()
-        print("The List of Current Players in Tournament")
-        print("Players Information:")
-        print("--------------------")
+        print(
+            "--------------------\n"
+            "Tournament Information:\n"
+            f"Name: {self.tournament.name}\n"
+            f"Venue: {self.tournament.venue}\n"
+            f"Dates: {self.tournament.start_date} to {self.tournament.end_date}\n"
+            f"Number of Rounds: {self.tournament.num_rounds}\n"
+            f"Current Round: {self.tournament.current_round}\n"
+            "\n"
+            "The List of Current Players in Tournament\n"
+            "Players Information:\n"
+            "--------------------"
+        )
+        PaginatedList(self.tournament.registered_players, self.player_line).browse()
+        print("********************")
 
-        for player_info in self.tournament.registered_players:
-            details = []
+    @staticmethod
+    def player_line(number, player_info):
+        """Line of a registered player in the tournament information (None if there is nothing to show)"""
+        details = []
 
-            if isinstance(player_info, PlayerDetails):
-                if player_info.name:
-                    details.append(f"Player Name: {player_info.name}")
-                if player_info.email:
-                    details.append(f"Email: {player_info.email}")
-                if player_info.chess_id:
-                    details.append(f"Play ID: {player_info.chess_id}")
-                if player_info.birthday:
-                    details.append(f"Birthday: {player_info.birthday}")
-            elif isinstance(player_info, dict):
-                player_details = PlayerDetails(**player_info)
-                if player_details.name:
-                    details.append(f"Player Name: {player_details.name}")
-                if player_details.email:
-                    details.append(f"Email: {player_details.email}")
-                if player_details.chess_id:
-                    details.append(f"Play ID: {player_details.chess_id}")
-                if player_details.birthday:
-                    details.append(f"Birthday: {player_details.birthday}")
-            else:
-                print(f"Unknown player information format: {type(player_info)}")
-                continue
+        if isinstance(player_info, dict):
+            player_info = PlayerDetails(**player_info)
+        elif not hasattr(player_info, "make_dict"):
+            return f"Unknown player information format: {type(player_info)}"
 
-            if details:
-                print(": ".join(details))
-        print("********************")
+        # PlayerDetails, or a row of a PlayerTable (large rosters)
+        if player_info.name:
+            details.append(f"Player Name: {player_info.name}")
+        if player_info.email:
+            details.append(f"Email: {player_info.email}")
+        if player_info.chess_id:
+            details.append(f"Play ID: {player_info.chess_id}")
+        if player_info.birthday:
+            details.append(f"Birthday: {player_info.birthday}")
+
+        return ": ".join(details) if details else None
 
     def get_command(self):
         print(
             "Type 'B' to go back to main menu, 'CR' to enter results for current round, or 'R' to generate report"
         )
+        print(
+            "Type 'F' to forecast the final standings (from the scores, without ratings)"
+        )
         action = input("Enter your action: ").strip().upper()
+        if action in ("B", "E"):
+            self.next_round.stop()
         if action == "B":
-            folder_path = Path(
-                "E:\\GitProjects\\P3-Application-Developer-Skills-Bootcamp\\data\\tournaments"
-            )
+            if self.tournament.filepath:
+                folder_path = Path(self.tournament.filepath).parent
+            else:
+                folder_path = Path(
+                    "E:\\GitProjects\\P3-Application-Developer-Skills-Bootcamp\\data\\tournaments"
+                )
             return TournamentListCmd(folder_path)
         elif action == "CR":
             self.enter_results_for_current_round()
@@ -107,6 +116,8 @@ class TournamentView(BaseScreen):
             self.advance_to_next_round()
         elif action == "R":
             self.generate_tournament_report()
+        elif action == "F":
+            self.forecast_standings()
         elif action == "E":
             return NoopCmd("exit", clubs=False)
         else:
@@ -120,35 +131,21 @@ class TournamentView(BaseScreen):
         if self.tournament.current_round == 0:
             self.tournament.current_round = 1
 
-        if not self.tournament.rounds[self.tournament.current_round - 1]:
-            pairings = TournamentOperations.generate_pairings_from_tournament(
-                self.tournament
-            )
-            self.tournament.rounds[self.tournament.current_round - 1] = [
-                {"players": [player1.chess_id, player2.chess_id], "completed": False}
-                for player1, player2 in pairings
-            ]
-
-        round_results = self.tournament.rounds[self.tournament.current_round - 1]
+        round_number = self.tournament.current_round
+        round_results = TournamentOperations.round_matches(
+            self.tournament, round_number
+        )
 
-        for match in round_results:
-            player1_id, player2_id = match["players"]
-            player1 = next(
-                (
-                    p
-                    for p in self.tournament.registered_players
-                    if p.chess_id == player1_id
-                ),
-                None,
-            )
-            player2 = next(
-                (
-                    p
-                    for p in self.tournament.registered_players
-                    if p.chess_id == player2_id
-                ),
-                None,
-            )
+        for match_index in range(len(round_results)):
+            # In shared mode, the results entered by the other arbiters are read first
+            self.tournament.refresh()
+            round_results = self.tournament.rounds[round_number - 1]
+            if match_index >= len(round_results):
+                break
+            match = round_results[match_index]
+            player1_id, player2_id = (match["players"] + [None])[:2]
+            player1 = self.tournament.get_player(player1_id)
+            player2 = self.tournament.get_player(player2_id)
 
             if not match.get("completed", False):
                 player1_name = player1.name if player1.name else player1.chess_id
@@ -175,24 +172,22 @@ class TournamentView(BaseScreen):
                         .lower()
                     )
 
-                match["completed"] = True
+                winner = {"win": player1_id, "loss": player2_id}.get(result)
+                # Updates the players points and their ranking, and logs the result
+                if not self.tournament.enter_result(
+                    round_number, match_index, winner, match["players"]
+                ):
+                    print("Another arbiter entered a different result: it is kept.")
+                    continue
                 if result == "win":
-                    match["winner"] = player1_id
-                    player1.points += 1
                     print(f"{player1_name} wins against {player2_name}")
                 elif result == "draw":
-                    match["winner"] = None
-                    player1.points += 0.5
-                    if player2:
-                        player2.points += 0.5
                     print(f"{player1_name} and {player2_name} draw")
                 elif result == "loss":
-                    match["winner"] = player2_id
-                    if player2:
-                        player2.points += 1
                     print(f"{player2_name} wins against {player1_name}")
+                if round_number < self.tournament.num_rounds:
+                    self.next_round.update()
 
-        self.tournament.save()
         self.advance_to_next_round()
 
     def advance_to_next_round(self):
@@ -201,20 +196,31 @@ class TournamentView(BaseScreen):
             return
 
         if self.tournament.current_round >= self.tournament.num_rounds:
-            self.tournament.finished = True
+            self.tournament.finish()
             print(
                 "Tournament has reached the maximum number of rounds and is now finished."
             )
         else:
+            round_number = self.tournament.current_round
             confirmation = (
                 input("Are you sure you want to advance to the next round? (yes/no): ")
                 .strip()
                 .lower()
             )
             if confirmation == "yes":
-                self.tournament.current_round += 1
+                if not self.tournament.advance_round(from_round=round_number):
+                    print(
+                        "Another arbiter already advanced to Round "
+                        f"{self.tournament.current_round}"
+                    )
+                    return
                 print(f"Advancing to Round {self.tournament.current_round}")
-                self.tournament.save()
+                # The new round is paired once, when it starts (in advance, if the results
+                # were entered here; in shared mode, other arbiters enter results too)
+                matches = self.next_round.matches()
+                TournamentOperations.round_matches(
+                    self.tournament, matches=None if self.tournament.shared else matches
+                )
             elif confirmation == "no":
                 print("Operation cancelled.")
             else:
@@ -223,19 +229,17 @@ class TournamentView(BaseScreen):
     def generate_tournament_report(self):
         print(f"Tournament Report for {self.tournament.name}")
         self.display_tournament_info()
-        players = self.tournament.registered_players
-        sorted_players = TournamentOperations.sort_players(players)
-        TournamentOperations.print_rankings(sorted_players)
+        TournamentOperations.print_standings(self.tournament.standings)
 
         for i, round_results in enumerate(self.tournament.rounds, start=1):
             print("--------------------")
             print(f"\nRound {i} Results: ")
             for match in round_results:
-                player1_id, player2_id = match["players"]
+                player1_id, player2_id = (match["players"] + [None])[:2]
                 result = match.get("winner")
 
-                player1 = next((p for p in players if p.chess_id == player1_id), None)
-                player2 = next((p for p in players if p.chess_id == player2_id), None)
+                player1 = self.tournament.get_player(player1_id)
+                player2 = self.tournament.get_player(player2_id)
 
                 if player1 and player2:
                     if result == player1_id:
@@ -253,6 +257,34 @@ class TournamentView(BaseScreen):
         # self.display_tournament_info()
         print("--------------------")
 
+    def forecast_standings(self, top=10):
+        """Prints the players most likely to win, from simulations of the remaining rounds"""
+        try:
+            simulator = TournamentSimulator(self.tournament)
+        except RuntimeError as e:
+            print(e)
+            return
+
+        result = simulator.run(FORECAST_SIMULATIONS)
+        print(
+            f"Forecast from {FORECAST_SIMULATIONS} simulations of the "
+            f"{simulator.rounds_left} remaining round(s):"
+        )
+        # The tournaments do not record ratings: the simulator rates everyone the same
+        print(
+            "The ratings of the players are unknown: every game is simulated as even, "
+            "so this only reflects the current scores and the rounds left."
+        )
+        for chess_id, probability in result.favourites(1, top):
+            player = self.tournament.get_player(chess_id)
+            name = player.name if player and player.name else chess_id
+            print(
+                f"{name}: wins {probability:.1%}, "
+                f"top 3 {result.probability_top(chess_id, 3):.1%}, "
+                f"expected points {result.expected_points(chess_id):.1f}"
+            )
+        print("--------------------")
+
     def display_tournament_info_without_players(self):
         print("Tournament Information:")
         print(f"Name: {self.tournament.name}")